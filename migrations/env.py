@@ -1,10 +1,13 @@
+import logging
 import sys
 from logging.config import fileConfig
 
 from alembic import context
 from sqlmodel import SQLModel
 
-from template_project.db.factories import get_session_ctx
+from template_project.config import DatabaseSettings
+from template_project.db.migrations import set_timeouts, with_lock_retries
+from template_project.db.sharding import get_shard_router
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -15,6 +18,8 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+logger = logging.getLogger('alembic.env')
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
@@ -46,18 +51,48 @@ def run_migrations_online() -> None:
 
     In this scenario we need to associate a connection with the context.
 
-    """
-    with get_session_ctx() as session:
-        connection = session.connection()
+    Each revision runs in its own transaction, so revisions can use
+    `op.get_context().autocommit_block()` for statements such as
+    `CREATE INDEX CONCURRENTLY`. A short `lock_timeout` keeps DDL waiting on a lock
+    from stalling every other query on the table; when it expires, the remaining
+    revisions are retried with exponential backoff.
 
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-            include_object=include_object,
-        )
+    When `PG_SHARDS` is set, migrations run on the main database and then on every
+    shard in turn, each shard keeping its own version table. Revisions can check
+    `current_shard()` for steps that only apply to the main database.
 
-        with context.begin_transaction():
-            context.run_migrations()
+    """
+    db_config = DatabaseSettings()  # type: ignore
+    router = get_shard_router()
+
+    for shard in router.shards:
+        with router.get_engine(shard).connect() as connection:
+            set_timeouts(
+                connection,
+                lock_timeout=db_config.MIGRATION_LOCK_TIMEOUT,
+                statement_timeout=db_config.MIGRATION_STATEMENT_TIMEOUT,
+            )
+            connection.commit()
+
+            context.configure(
+                connection=connection,
+                target_metadata=target_metadata,
+                include_object=include_object,
+                transaction_per_migration=True,
+                shard=shard,
+            )
+
+            def run_migrations():
+                with context.begin_transaction():
+                    context.run_migrations()
+
+            if len(router.shards) > 1:
+                logger.info(f"Running migrations on shard {shard}")
+            with_lock_retries(
+                run_migrations,
+                retries=db_config.MIGRATION_LOCK_RETRIES,
+                delay=db_config.MIGRATION_LOCK_RETRY_DELAY,
+            )
 
 
 def prompt_for_downgrade():
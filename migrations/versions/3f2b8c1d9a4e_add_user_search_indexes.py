@@ -0,0 +1,50 @@
+"""add user search indexes
+
+Revision ID: 3f2b8c1d9a4e
+Revises: 7e10925edf03
+Create Date: 2026-10-19 09:12:41.503128+00:00
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+from template_project.db.migrations import (
+    create_index_concurrently,
+    drop_index_concurrently,
+)
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2b8c1d9a4e'
+down_revision: str | None = '7e10925edf03'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # fails if emails differing only by case already exist, which must be merged first
+    create_index_concurrently(
+        'ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=True
+    )
+    create_index_concurrently(
+        'ix_users_email_trgm',
+        'users',
+        [sa.text('lower(email) gin_trgm_ops')],
+        postgresql_using='gin',
+    )
+    create_index_concurrently(
+        'ix_users_name_trgm',
+        'users',
+        [sa.text("lower(first_name || ' ' || last_name) gin_trgm_ops")],
+        postgresql_using='gin',
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently('ix_users_name_trgm', 'users')
+    drop_index_concurrently('ix_users_email_trgm', 'users')
+    drop_index_concurrently('ix_users_email_lower', 'users')
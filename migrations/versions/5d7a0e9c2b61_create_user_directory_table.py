@@ -0,0 +1,45 @@
+"""create user directory table
+
+Revision ID: 5d7a0e9c2b61
+Revises: c81d5a3e6f20
+Create Date: 2026-10-19 13:02:36.540172+00:00
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+
+from template_project.db.migrations import current_shard
+
+# revision identifiers, used by Alembic.
+revision: str = '5d7a0e9c2b61'
+down_revision: str | None = 'c81d5a3e6f20'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_directory',
+        sa.Column(
+            'email', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False
+        ),
+        sa.Column('user_id', sa.Uuid(), nullable=False),
+        sa.Column('shard', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('email'),
+        sa.UniqueConstraint('user_id'),
+    )
+
+    # Users created before sharding are all in the main database
+    if current_shard() == 0:
+        op.execute(
+            "INSERT INTO user_directory (email, user_id, shard) "
+            "SELECT lower(email), id, 0 FROM users ON CONFLICT DO NOTHING"
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('user_directory')
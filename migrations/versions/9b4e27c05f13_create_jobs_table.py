@@ -0,0 +1,58 @@
+"""create jobs table
+
+Revision ID: 9b4e27c05f13
+Revises: 3f2b8c1d9a4e
+Create Date: 2026-10-19 10:04:18.227561+00:00
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+import sqlmodel
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e27c05f13'
+down_revision: str | None = '3f2b8c1d9a4e'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'jobs',
+        sa.Column('id', sa.BigInteger(), nullable=False),
+        sa.Column('name', sqlmodel.sql.sqltypes.AutoString(length=255), nullable=False),
+        sa.Column('payload', postgresql.JSONB(), nullable=False),
+        sa.Column('priority', sa.Integer(), nullable=False),
+        sa.Column(
+            'status', sqlmodel.sql.sqltypes.AutoString(length=16), nullable=False
+        ),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('max_attempts', sa.Integer(), nullable=False),
+        sa.Column(
+            'run_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.Column('locked_at', sa.DateTime(), nullable=True),
+        sa.Column('last_error', sqlmodel.sql.sqltypes.AutoString(), nullable=True),
+        sa.Column(
+            'created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.Column(
+            'updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False
+        ),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_jobs_queued',
+        'jobs',
+        [sa.text('priority DESC'), 'run_at'],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_queued', table_name='jobs')
+    op.drop_table('jobs')
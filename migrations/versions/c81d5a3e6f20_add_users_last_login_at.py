@@ -0,0 +1,28 @@
+"""add users last_login_at
+
+Revision ID: c81d5a3e6f20
+Revises: 9b4e27c05f13
+Create Date: 2026-10-19 11:27:05.918342+00:00
+
+"""
+
+from typing import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'c81d5a3e6f20'
+down_revision: str | None = '9b4e27c05f13'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    # A nullable column without a default only updates the catalog, so the table is
+    # neither rewritten nor locked for longer than `lock_timeout`.
+    op.add_column('users', sa.Column('last_login_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'last_login_at')
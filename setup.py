@@ -1,6 +1,13 @@
 from setuptools import find_packages, setup
 
-deps = {'tests': ['flake8']}
+deps = {
+    'tests': ['flake8', 'pytest', 'anyio', 'fakeredis[lua]'],
+    'orjson': ['orjson'],
+    'msgpack': ['msgpack'],
+    'zstd': ['zstandard'],
+    'lz4': ['lz4'],
+    'bench': ['httpx'],
+}
 
 setup(
     name='template-project',
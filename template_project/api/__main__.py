@@ -1,7 +1,7 @@
-import logging
-
 from template_project.api.factories import create_api_application
+from template_project.config import LoggingSettings
+from template_project.logs import configure_logging
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+configure_logging(LoggingSettings())
 
 app = create_api_application()
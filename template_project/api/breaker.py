@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker bounding the calls to a dependency with a timeout.
+
+    The breaker opens after `failure_threshold` consecutive failures or timeouts, and
+    calls are then rejected with `CircuitOpenError` without waiting on the dependency.
+    After `reset_timeout` seconds the breaker is half-open: a single trial call is let
+    through, which closes the breaker when it succeeds and opens it again otherwise.
+
+    Args:
+        name: The name of the dependency, used in logs.
+        timeout: The maximum duration of a call in seconds.
+        failure_threshold: The number of consecutive failures that opens the breaker.
+        reset_timeout: The time in seconds before a trial call is let through.
+        failure_exceptions: The exceptions counted as failures of the dependency. Other
+            exceptions are raised without affecting the breaker.
+        on_close (optional): Called when the breaker closes again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        failure_threshold: int,
+        reset_timeout: float,
+        failure_exceptions: tuple[type[BaseException], ...] = (Exception,),
+        on_close: Callable[[], Any] | None = None,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_exceptions = (asyncio.TimeoutError, *failure_exceptions)
+        self.on_close = on_close
+
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.trips = 0
+        self.rejected = 0
+        self.last_error: str | None = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        """The current state, `closed`, `open` or `half-open`."""
+        if self.opened_at is None:
+            return CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """Whether a call would currently be let through."""
+        state = self.state
+        return state == CLOSED or (state == HALF_OPEN and not self._probing)
+
+    async def call(self, operation: Callable[[], Awaitable[T]]) -> T:
+        """
+        Call the dependency through the breaker.
+
+        Args:
+            operation: Creates the awaitable calling the dependency.
+
+        Returns:
+            The result of the operation.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or a trial call is in progress.
+            asyncio.TimeoutError: If the operation did not complete in time.
+        """
+        if not self.allow():
+            self.rejected += 1
+            raise CircuitOpenError(f"Circuit breaker for {self.name} is open")
+
+        probing = self.state == HALF_OPEN
+        self._probing = self._probing or probing
+        try:
+            result = await asyncio.wait_for(operation(), self.timeout)
+        except self.failure_exceptions as exc:
+            self._record_failure(exc)
+            raise
+        finally:
+            if probing:
+                self._probing = False
+
+        self._record_success()
+        return result
+
+    def _record_success(self) -> None:
+        self.failures = 0
+        if self.opened_at is not None:
+            self.opened_at = None
+            logger.info(f"Circuit breaker for {self.name} closed")
+            if self.on_close:
+                self.on_close()
+
+    def _record_failure(self, exc: BaseException) -> None:
+        self.failures += 1
+        self.last_error = repr(exc)
+
+        if self.state == HALF_OPEN or (
+            self.opened_at is None and self.failures >= self.failure_threshold
+        ):
+            self.opened_at = time.monotonic()
+            self.trips += 1
+            logger.warning(
+                f"Circuit breaker for {self.name} opened after "
+                f"{self.failures} failures, last error: {self.last_error}"
+            )
+
+    def info(self) -> dict[str, Any]:
+        """Report the state and counters of the breaker."""
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'trips': self.trips,
+            'rejected': self.rejected,
+            'last_error': self.last_error,
+        }
@@ -1,13 +1,72 @@
-from typing import Any, Callable, Dict, Tuple
+import asyncio
+import logging
+import uuid
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 from fastapi import Request, Response
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends import Backend
 from fastapi_cache.backends.inmemory import InMemoryBackend
 from fastapi_cache.backends.redis import RedisBackend
-from redis import asyncio as aioredis
+from fastapi_cache.types import KeyBuilder
+from pydantic import ValidationError
+from redis.asyncio import BlockingConnectionPool, Redis
+from redis.asyncio.cluster import RedisCluster
+from redis.asyncio.retry import Retry
+from redis.asyncio.sentinel import Sentinel
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
 
+from template_project.api.breaker import CircuitBreaker, CircuitOpenError
+from template_project.api.coders import FramedCoder, get_coder
+from template_project.api.conditional import make_etag
 from template_project.config import CacheSettings
+from template_project.models.database import User
+from template_project.models.validation import CachedUser, UserPublic
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+redis_client = None
+
+# Circuit breaker guarding every Redis operation, when Redis is configured
+breaker: CircuitBreaker | None = None
+
+# Errors counted as Redis outages by the breaker. Command errors, e.g. a command not
+# supported by the server, are raised without affecting it.
+REDIS_FAILURES = (ConnectionError, TimeoutError, OSError)
+
+# Tags whose invalidation failed, retried once Redis is reachable again
+failed_invalidations: set[str] = set()
+MAX_FAILED_INVALIDATIONS = 10000
+
+# In-memory tag index, used when no Redis client is configured
+tag_index: dict[str, set[str]] = {}
+
+# Expiration of entity cache entries in seconds, and delay before a user is
+# invalidated a second time, set from `CacheSettings` by `initialise_cache`
+entity_expiration: int | None = None
+invalidation_delay: float = 0
+
+# Delayed invalidations, referenced until they complete
+_delayed_invalidations: set[asyncio.Task] = set()
+
+# Tags of the response cache keys built during the current request, by key
+pending_tags: ContextVar[dict[str, tuple[str, ...]] | None] = ContextVar(
+    'pending_tags', default=None
+)
 
 
 def request_key_builder(
@@ -35,22 +94,701 @@ def request_key_builder(
     return key
 
 
-def get_cache_backend(backend: str, connection_string: str | None) -> Backend:
-    if backend == 'redis':
-        redis = aioredis.from_url(connection_string)
-        return RedisBackend(redis)
+def tagged_key_builder(tags: Callable[..., Iterable[str]]) -> KeyBuilder:
+    """
+    Create a key builder that attaches tags to cached responses.
+
+    The returned key builder builds keys with `request_key_builder` and records the
+    tags of each key, which `TaggedBackend` stores alongside the cached response.
+
+    Args:
+        tags: A callable receiving the `request` and the endpoint `kwargs` as keyword
+            arguments and returning the tags of the response, e.g. `user:<id>`.
+
+    Returns:
+        A key builder for the `fastapi_cache.decorator.cache` decorator.
+
+    Usage:
+        ```python
+        @cache(key_builder=tagged_key_builder(lambda request, kwargs: [...]))
+        async def example():
+            pass
+        ```
+    """
+
+    def key_builder(
+        func: Callable[..., Any],
+        namespace: str = "",
+        *,
+        request: Request | None = None,
+        response: Response | None = None,
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+    ) -> str:
+        key = request_key_builder(
+            func,
+            namespace,
+            request=request,
+            response=response,
+            args=args,
+            kwargs=kwargs,
+        )
+
+        keys = pending_tags.get()
+        if keys is None:
+            keys = {}
+            pending_tags.set(keys)
+        keys[key] = tuple(tags(request=request, kwargs=kwargs))
+
+        return key
+
+    return key_builder
+
+
+class TaggedBackend(Backend):
+    """
+    Cache backend wrapper that records the tags of cached responses.
+
+    Delegate every operation to the wrapped backend, and register the tags recorded by
+    `tagged_key_builder` for a key when the response is stored.
+    """
+
+    def __init__(self, backend: Backend):
+        self.backend = backend
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        return await self.backend.get_with_ttl(key)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        await self.backend.set(key, value, expire)
+
+        keys = pending_tags.get()
+        if keys and keys.get(key):
+            try:
+                await register_tags({key: keys.pop(key)}, expire)
+            except CircuitOpenError:
+                pass
+
+    async def clear(
+        self, namespace: Optional[str] = None, key: Optional[str] = None
+    ) -> int:
+        return await self.backend.clear(namespace, key)
+
+
+class CircuitBreakerBackend(Backend):
+    """
+    Cache backend wrapper bounding every operation with the timeout of a circuit
+    breaker.
+
+    While the breaker is open, reads are misses and writes are skipped without waiting
+    on the wrapped backend, so cached endpoints run their handler directly.
+    """
+
+    def __init__(self, backend: Backend, breaker: CircuitBreaker):
+        self.backend = backend
+        self.breaker = breaker
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        try:
+            return await self.breaker.call(lambda: self.backend.get_with_ttl(key))
+        except CircuitOpenError:
+            return 0, None
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            return await self.breaker.call(lambda: self.backend.get(key))
+        except CircuitOpenError:
+            return None
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        try:
+            await self.breaker.call(lambda: self.backend.set(key, value, expire))
+        except CircuitOpenError:
+            pass
+
+    async def clear(
+        self, namespace: Optional[str] = None, key: Optional[str] = None
+    ) -> int:
+        return await self.breaker.call(lambda: self.backend.clear(namespace, key))
+
+
+def create_redis_client(config: CacheSettings) -> Redis | RedisCluster:
+    """
+    Create a Redis client backed by a single, bounded connection pool.
+
+    Support standalone, Sentinel and Cluster deployments, selected by
+    `CacheSettings.REDIS_MODE`. Pool size, timeouts, health checks and the retry
+    policy are loaded from the `CacheSettings` model.
+
+    Args:
+        config: The cache configuration.
+
+    Returns:
+        A configured asynchronous Redis client.
+    """
+    retry = Retry(
+        ExponentialBackoff(
+            cap=config.RETRY_BACKOFF_CAP, base=config.RETRY_BACKOFF_BASE
+        ),
+        config.RETRY_ATTEMPTS,
+    )
+    options = {
+        'socket_timeout': config.SOCKET_TIMEOUT,
+        'socket_connect_timeout': config.SOCKET_CONNECT_TIMEOUT,
+        'health_check_interval': config.HEALTH_CHECK_INTERVAL,
+        'retry': retry,
+        'retry_on_error': [ConnectionError, TimeoutError],
+    }
+
+    if config.REDIS_MODE == 'cluster':
+        return RedisCluster.from_url(
+            config.CONNECTION_STRING,
+            max_connections=config.MAX_CONNECTIONS,
+            **options,
+        )
+
+    if config.REDIS_MODE == 'sentinel':
+        sentinels = [
+            (host, int(port))
+            for host, port in (entry.rsplit(':', 1) for entry in config.SENTINEL_HOSTS)
+        ]
+        sentinel = Sentinel(
+            sentinels,
+            sentinel_kwargs={'socket_timeout': config.SOCKET_TIMEOUT},
+            max_connections=config.MAX_CONNECTIONS,
+            **options,
+        )
+        return sentinel.master_for(config.SENTINEL_SERVICE_NAME)
+
+    pool = BlockingConnectionPool.from_url(
+        config.CONNECTION_STRING,
+        max_connections=config.MAX_CONNECTIONS,
+        timeout=config.POOL_TIMEOUT,
+        **options,
+    )
+    return Redis(connection_pool=pool)
+
+
+def get_redis_client() -> Redis | RedisCluster | None:
+    """Return the Redis client shared across the application, if configured."""
+    return redis_client
+
+
+def get_breaker() -> CircuitBreaker | None:
+    """Return the circuit breaker guarding Redis, if configured."""
+    return breaker
+
+
+async def call_redis(operation: Callable[[], Awaitable[T]]) -> T:
+    """
+    Call Redis through the circuit breaker, when configured.
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open.
+    """
+    if breaker:
+        return await breaker.call(operation)
+    return await operation()
+
+
+def get_cache_backend(config: CacheSettings) -> Backend:
+    """
+    Create the cache backend selected by `CacheSettings.BACKEND`.
+
+    The Redis client is created once per process and shared by the cache backend and
+    every other consumer of `get_redis_client`. Redis operations go through a circuit
+    breaker, see `CircuitBreakerBackend`.
+    """
+    global redis_client, breaker
+
+    if config.BACKEND == 'redis':
+        if not redis_client:
+            redis_client = create_redis_client(config)
+        if not breaker:
+            breaker = CircuitBreaker(
+                'redis',
+                timeout=config.OPERATION_TIMEOUT,
+                failure_threshold=config.BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=config.BREAKER_RESET_TIMEOUT,
+                failure_exceptions=REDIS_FAILURES,
+                on_close=_schedule_retry_invalidations,
+            )
+        return CircuitBreakerBackend(RedisBackend(redis_client), breaker)
     else:
         return InMemoryBackend()
 
 
 def initialise_cache():
+    global entity_expiration, invalidation_delay
+
     cache_config = CacheSettings()
+    entity_expiration = cache_config.ENTITY_EXPIRATION
+    invalidation_delay = cache_config.INVALIDATION_DELAY
+
+    backend = TaggedBackend(get_cache_backend(cache_config))
+    coder = get_coder(cache_config)
+
+    prefix = cache_config.PREFIX
+    if issubclass(coder, FramedCoder):
+        prefix = f"{prefix}:{coder.key_tag}"
 
-    backend = get_cache_backend(cache_config.BACKEND, cache_config.CONNECTION_STRING)
     FastAPICache.init(
         backend=backend,
         expire=cache_config.EXPIRATION,
-        prefix=cache_config.PREFIX,
+        prefix=prefix,
+        coder=coder,
         key_builder=request_key_builder,
         enable=cache_config.ENABLED,
     )
+
+
+async def close_cache():
+    """Close the shared Redis client and release its connection pool."""
+    global redis_client, breaker
+
+    if isinstance(redis_client, Redis):
+        # A client given its pool does not close it by default
+        await redis_client.close(close_connection_pool=True)
+    elif redis_client:
+        await redis_client.close()
+    redis_client = None
+    breaker = None
+
+
+async def clear_namespace(namespace: str | None = None, batch_size: int = 500) -> int:
+    """
+    Delete every cached key within a namespace.
+
+    For Redis, keys are found incrementally with `SCAN` instead of the blocking
+    `KEYS` command used by `FastAPICache.clear`, and each page of keys is removed
+    with pipelined `UNLINK` commands in a single round trip.
+
+    Args:
+        namespace (optional): The namespace to clear. Defaults to the whole prefix.
+        batch_size (optional): The number of keys to scan and delete per round trip.
+
+    Returns:
+        The number of deleted keys.
+
+    Raises:
+        CircuitOpenError: If the circuit breaker guarding Redis is open.
+    """
+    client = get_redis_client()
+    if not client:
+        return await FastAPICache.clear(namespace)
+    if breaker and not breaker.allow():
+        raise CircuitOpenError("Circuit breaker for redis is open")
+
+    pattern = FastAPICache.get_prefix() + (":" + namespace if namespace else "")
+    count = 0
+    keys = []
+
+    async def unlink(batch: list[bytes]) -> int:
+        async with client.pipeline(transaction=False) as pipe:
+            for key in batch:
+                pipe.unlink(key)
+            return sum(await call_redis(pipe.execute))
+
+    async for key in client.scan_iter(match=f"{pattern}:*", count=batch_size):
+        keys.append(key)
+        if len(keys) >= batch_size:
+            count += await unlink(keys)
+            keys = []
+
+    if keys:
+        count += await unlink(keys)
+
+    return count
+
+
+def user_cache_key(user_id: uuid.UUID | str) -> str:
+    """Build the entity cache key for a user."""
+    return ":".join([FastAPICache.get_prefix(), "entity", "user", str(user_id)])
+
+
+def user_email_cache_key(email: str) -> str:
+    """Build the entity cache key pointing from a user's email to the user's ID."""
+    return ":".join([FastAPICache.get_prefix(), "entity", "user-email", email.lower()])
+
+
+async def get_many(*keys: str) -> list[bytes | None]:
+    """
+    Retrieve multiple keys from the configured cache backend.
+
+    Use a single `MGET` round trip for Redis, split per node for Redis Cluster, and
+    fall back to individual lookups for other backends.
+
+    Args:
+        keys: The cache keys to retrieve.
+
+    Returns:
+        The cached values in the order of the given keys, with None for misses.
+    """
+    if not keys:
+        return []
+
+    client = get_redis_client()
+    if isinstance(client, RedisCluster):
+        return await call_redis(lambda: client.mget_nonatomic(keys))
+    if client:
+        return await call_redis(lambda: client.mget(keys))
+
+    backend = FastAPICache.get_backend()
+    return [await backend.get(key) for key in keys]
+
+
+async def set_many(
+    values: dict[str, bytes],
+    expire: int | None = None,
+    tags: dict[str, Iterable[str]] | None = None,
+) -> None:
+    """
+    Store multiple keys, and optionally their tags, in the configured cache backend.
+
+    Use a single pipelined round trip for Redis, and fall back to individual writes
+    for other backends.
+
+    Args:
+        values: A mapping of cache keys to the values to store.
+        expire (optional): The expiration of the keys in seconds.
+        tags (optional): A mapping of cache keys to their tags.
+    """
+    if not values:
+        return
+
+    client = get_redis_client()
+    if client:
+        async with client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, value, ex=expire)
+            _pipe_register_tags(pipe, tags or {}, expire)
+            await call_redis(pipe.execute)
+        return
+
+    backend = FastAPICache.get_backend()
+    for key, value in values.items():
+        await backend.set(key, value, expire)
+    await register_tags(tags or {}, expire)
+
+
+async def delete_keys(*keys: str) -> int:
+    """
+    Delete the given keys from the configured cache backend.
+
+    Returns:
+        The number of deleted keys.
+    """
+    if not keys:
+        return 0
+
+    client = get_redis_client()
+    if client:
+        async with client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.unlink(key)
+            return sum(await call_redis(pipe.execute))
+
+    backend = FastAPICache.get_backend()
+    if isinstance(backend, TaggedBackend):
+        backend = backend.backend
+
+    count = 0
+    if isinstance(backend, InMemoryBackend):
+        async with backend._lock:
+            for key in keys:
+                count += backend._store.pop(key, None) is not None
+    return count
+
+
+def tag_cache_key(tag: str) -> str:
+    """Build the cache key of the set holding the keys of a tag."""
+    return ":".join([FastAPICache.get_prefix(), "tag", tag])
+
+
+# Extend the expiration of a key, never shortening it. Equivalent to `EXPIRE NX`
+# followed by `EXPIRE GT`, which require Redis 7.
+EXTEND_EXPIRATION_SCRIPT = """
+local ttl = redis.call('TTL', KEYS[1])
+if ttl == -1 or ttl < tonumber(ARGV[1]) then
+    return redis.call('EXPIRE', KEYS[1], ARGV[1])
+end
+return 0
+"""
+
+
+def _pipe_register_tags(pipe: Any, tags: dict[str, Iterable[str]], expire: int | None):
+    for key, key_tags in tags.items():
+        for tag in key_tags:
+            pipe.sadd(tag_cache_key(tag), key)
+            if expire:
+                # keep the tag set for as long as its longest-lived key
+                pipe.eval(EXTEND_EXPIRATION_SCRIPT, 1, tag_cache_key(tag), expire)
+
+
+async def register_tags(
+    tags: dict[str, Iterable[str]], expire: int | None = None
+) -> None:
+    """
+    Record the tags of cached keys.
+
+    Tags are stored as Redis sets of keys, or in the in-memory `tag_index` for other
+    backends.
+
+    Args:
+        tags: A mapping of cache keys to their tags.
+        expire (optional): The expiration of the keys in seconds.
+    """
+    if not tags:
+        return
+
+    client = get_redis_client()
+    if client:
+        async with client.pipeline(transaction=False) as pipe:
+            _pipe_register_tags(pipe, tags, expire)
+            await call_redis(pipe.execute)
+        return
+
+    for key, key_tags in tags.items():
+        for tag in key_tags:
+            tag_index.setdefault(tag_cache_key(tag), set()).add(key)
+
+
+async def invalidate_tags(*tags: str) -> int:
+    """
+    Delete every cached key carrying any of the given tags.
+
+    The cost depends on the number of affected keys, not on the size of the keyspace.
+
+    Args:
+        tags: The tags to invalidate, e.g. `user:<id>`.
+
+    Returns:
+        The number of deleted keys.
+    """
+    if not tags:
+        return 0
+
+    tag_keys = [tag_cache_key(tag) for tag in tags]
+
+    client = get_redis_client()
+    if not client:
+        members = {tag_key: set(tag_index.get(tag_key, ())) for tag_key in tag_keys}
+        count = await delete_keys(*set().union(*members.values()))
+        for tag_key, keys in members.items():
+            tag_index[tag_key] = tag_index.get(tag_key, set()) - keys
+            if not tag_index[tag_key]:
+                del tag_index[tag_key]
+        return count
+
+    async with client.pipeline(transaction=False) as pipe:
+        for tag_key in tag_keys:
+            pipe.smembers(tag_key)
+        members = dict(zip(tag_keys, await call_redis(pipe.execute)))
+
+    keys = set().union(*members.values())
+    if not keys:
+        return 0
+
+    # Delete the keys before removing them from their tag sets, so a failure leaves
+    # the tags in place and a retry finds the keys again. Only the members read are
+    # removed, so keys tagged in between are kept.
+    async with client.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.unlink(key)
+        for tag_key, tag_members in members.items():
+            if tag_members:
+                pipe.srem(tag_key, *tag_members)
+        results = await call_redis(pipe.execute)
+
+    return sum(results[: len(keys)])
+
+
+def user_tag(user_id: uuid.UUID | str) -> str:
+    """Build the cache tag of every cached key derived from a user."""
+    return f"user:{user_id}"
+
+
+def to_cached_user(user: User) -> CachedUser:
+    """Build the entity cache entry of a user, including its HTTP validators."""
+    return CachedUser(
+        user=UserPublic.model_validate(user),
+        etag=make_etag(user.id, user.updated_at),
+        last_modified=user.updated_at,
+    )
+
+
+async def get_cached_users(
+    user_ids: Sequence[uuid.UUID | str],
+) -> dict[str, CachedUser]:
+    """
+    Retrieve multiple users from the entity cache in a single round trip.
+
+    Args:
+        user_ids: The unique identifiers of the users.
+
+    Returns:
+        A mapping of the string representation of each cached user's ID to its
+        entry. Misses and entries that cannot be decoded are omitted, and an empty
+        mapping is returned if caching is disabled or the cache backend is
+        unavailable.
+    """
+    if not FastAPICache.get_enable() or not user_ids:
+        return {}
+
+    try:
+        values = await get_many(*[user_cache_key(user_id) for user_id in user_ids])
+    except CircuitOpenError:
+        return {}
+    except Exception:
+        logger.warning("Error retrieving users from cache backend:", exc_info=True)
+        return {}
+
+    coder = FastAPICache.get_coder()
+    cached = {}
+    for user_id, value in zip(user_ids, values):
+        if value is None:
+            continue
+        try:
+            cached[str(user_id)] = CachedUser.model_validate(coder.decode(value))
+        except (ValueError, ValidationError):
+            # e.g. written by a newer release during a rolling deploy. The entry is
+            # a miss, and is overwritten once the user is loaded from the database.
+            logger.warning(f"Undecodable cache entry for user {user_id}", exc_info=True)
+    return cached
+
+
+async def get_cached_user(user_id: uuid.UUID | str) -> CachedUser | None:
+    """
+    Retrieve a user from the entity cache.
+
+    Args:
+        user_id: The unique identifier of the user.
+
+    Returns:
+        The cached user entry, or None if caching is disabled, the entry is missing
+        or the cache backend is unavailable.
+    """
+    cached = await get_cached_users([user_id])
+    return cached.get(str(user_id))
+
+
+async def get_cached_user_ids(emails: Sequence[str]) -> dict[str, str]:
+    """
+    Resolve multiple emails to user IDs through the entity cache.
+
+    Args:
+        emails: The email addresses of the users.
+
+    Returns:
+        A mapping of each cached email to the string representation of the user's ID.
+    """
+    if not FastAPICache.get_enable() or not emails:
+        return {}
+
+    try:
+        values = await get_many(*[user_email_cache_key(email) for email in emails])
+    except CircuitOpenError:
+        return {}
+    except Exception:
+        logger.warning(
+            "Error retrieving user emails from cache backend:", exc_info=True
+        )
+        return {}
+
+    return {
+        email: value.decode()
+        for email, value in zip(emails, values)
+        if value is not None
+    }
+
+
+async def set_cached_users(entries: Sequence[CachedUser]) -> None:
+    """
+    Store multiple user entries, and their email pointers, in the entity cache.
+
+    Args:
+        entries: The user entries to store.
+    """
+    if not FastAPICache.get_enable() or not entries:
+        return
+
+    coder = FastAPICache.get_coder()
+    values = {}
+    tags = {}
+    for cached in entries:
+        key = user_cache_key(cached.user.id)
+        values[key] = coder.encode(cached)
+        values[user_email_cache_key(cached.user.email)] = str(cached.user.id).encode()
+        tags[key] = [user_tag(cached.user.id)]
+
+    # Entries are also bounded by an expiration, as a read that loaded a user before
+    # an update can store it after the update invalidated the user
+    expire = FastAPICache.get_expire()
+    if entity_expiration:
+        expire = min(expire or entity_expiration, entity_expiration)
+
+    try:
+        await set_many(values, expire, tags=tags)
+    except CircuitOpenError:
+        pass
+    except Exception:
+        logger.warning("Error setting users in cache backend:", exc_info=True)
+
+
+async def set_cached_user(cached: CachedUser) -> None:
+    """Store a user entry in the entity cache, if caching is enabled."""
+    await set_cached_users([cached])
+
+
+async def invalidate_cached_user(user_id: uuid.UUID | str) -> None:
+    """
+    Remove a user entry, and every cached response tagged with the user, from the
+    cache, if caching is enabled.
+
+    Invalidations that fail, including while the circuit breaker is open, are retried
+    with the next invalidation and as soon as the breaker closes.
+
+    The user is invalidated again after `CACHE_INVALIDATION_DELAY` seconds, to remove
+    an entry stored by a concurrent read that loaded the user before the update.
+    """
+    if not FastAPICache.get_enable():
+        return
+
+    await _invalidate_or_defer(user_tag(user_id), *failed_invalidations)
+
+    if invalidation_delay:
+        task = asyncio.create_task(_invalidate_later(user_tag(user_id)))
+        _delayed_invalidations.add(task)
+        task.add_done_callback(_delayed_invalidations.discard)
+
+
+async def _invalidate_later(tag: str) -> None:
+    await asyncio.sleep(invalidation_delay)
+    await _invalidate_or_defer(tag)
+
+
+async def _invalidate_or_defer(*tags: str) -> None:
+    try:
+        await invalidate_tags(*tags)
+    except Exception as exc:
+        if not isinstance(exc, CircuitOpenError):
+            logger.warning(f"Error invalidating tags {tags} in backend:", exc_info=True)
+        if len(failed_invalidations) + len(tags) > MAX_FAILED_INVALIDATIONS:
+            logger.error(
+                f"Too many failed cache invalidations, dropping all "
+                f"{len(failed_invalidations)} pending invalidations"
+            )
+            failed_invalidations.clear()
+        failed_invalidations.update(tags)
+    else:
+        failed_invalidations.difference_update(tags)
+
+
+def _schedule_retry_invalidations() -> None:
+    if failed_invalidations:
+        asyncio.get_running_loop().create_task(
+            _invalidate_or_defer(*failed_invalidations)
+        )
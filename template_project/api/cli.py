@@ -1,6 +1,8 @@
 import click
 import uvicorn
 
+from template_project.config import APISettings
+
 
 @click.group()
 def api():
@@ -22,4 +24,10 @@ def start(host, port, reload):
         host=host,
         port=port,
         reload=reload,
+        # logging is configured by the application, and requests are logged by
+        # `AccessLogMiddleware`
+        log_config=None,
+        access_log=False,
+        # on shutdown, wait for in-flight requests before cancelling them
+        timeout_graceful_shutdown=APISettings().DRAIN_TIMEOUT,  # type: ignore
     )
@@ -0,0 +1,184 @@
+import json
+from typing import Any, Callable, ClassVar
+
+from fastapi.encoders import jsonable_encoder
+from fastapi_cache.coder import Coder, JsonCoder
+from starlette.responses import JSONResponse
+
+from template_project.config import CacheSettings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+
+# Framed values start with a byte that can never start a UTF-8 encoded JSON document,
+# so entries written by the plain `JsonCoder` can still be told apart and decoded.
+MAGIC = b'\xfe'
+FORMAT_VERSION = 1
+HEADER_SIZE = 4
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':'), default=jsonable_encoder).encode()
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(value, default=jsonable_encoder)
+
+
+def _orjson_loads(value: bytes) -> Any:
+    return orjson.loads(value)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, use_bin_type=True, default=jsonable_encoder)
+
+
+def _msgpack_loads(value: bytes) -> Any:
+    return msgpack.unpackb(value, raw=False)
+
+
+def _zstd_compress(value: bytes) -> bytes:
+    return zstandard.ZstdCompressor().compress(value)
+
+
+def _zstd_decompress(value: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(value)
+
+
+def _lz4_compress(value: bytes) -> bytes:
+    return lz4.frame.compress(value)
+
+
+def _lz4_decompress(value: bytes) -> bytes:
+    return lz4.frame.decompress(value)
+
+
+# name: (identifier, dependency, dumps, loads)
+SERIALIZERS: dict[str, tuple[int, Any, Callable, Callable]] = {
+    'json': (1, json, _json_dumps, json.loads),
+    'orjson': (2, orjson, _orjson_dumps, _orjson_loads),
+    'msgpack': (3, msgpack, _msgpack_dumps, _msgpack_loads),
+}
+
+# name: (identifier, dependency, compress, decompress)
+COMPRESSORS: dict[str, tuple[int, Any, Callable, Callable]] = {
+    'none': (0, None, bytes, bytes),
+    'zstd': (1, zstandard, _zstd_compress, _zstd_decompress),
+    'lz4': (2, lz4, _lz4_compress, _lz4_decompress),
+}
+
+
+def _by_identifier(registry: dict, identifier: int) -> tuple:
+    for entry in registry.values():
+        if entry[0] == identifier:
+            if entry[0] and entry[1] is None:
+                raise ValueError(f"Missing dependency to decode format {identifier}")
+            return entry
+    raise ValueError(f"Unknown cache format {identifier}")
+
+
+class FramedCoder(Coder):
+    """
+    Versioned, pluggable coder for cached values.
+
+    Values are serialized with the configured serializer, converting unsupported types
+    with `jsonable_encoder`, and compressed when larger than the configured threshold.
+    A four byte header records the format version, serializer and compression, so any
+    worker can decode entries written with a different configuration. Values written
+    by the plain `JsonCoder` are still decoded.
+    """
+
+    # Appended to the cache prefix, so that workers still running the plain
+    # `JsonCoder` during a rolling deploy never read framed entries.
+    key_tag: ClassVar[str] = f"c{FORMAT_VERSION}"
+    serializer: ClassVar[str] = 'json'
+    compression: ClassVar[str] = 'none'
+    compression_threshold: ClassVar[int] = 1024
+
+    @classmethod
+    def encode(cls, value: Any) -> bytes:
+        if isinstance(value, JSONResponse):
+            value = json.loads(value.body)
+
+        serializer_id, _, dumps, _ = SERIALIZERS[cls.serializer]
+        data = dumps(value)
+
+        compression_id = 0
+        if cls.compression != 'none' and len(data) >= cls.compression_threshold:
+            compression_id, _, compress, _ = COMPRESSORS[cls.compression]
+            data = compress(data)
+
+        header = MAGIC + bytes([FORMAT_VERSION, serializer_id, compression_id])
+        return header + data
+
+    @classmethod
+    def decode(cls, value: bytes) -> Any:
+        if not value.startswith(MAGIC):
+            return JsonCoder.decode(value)
+
+        version, serializer_id, compression_id = value[1:HEADER_SIZE]
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version {version}")
+
+        data = value[HEADER_SIZE:]
+        if compression_id:
+            data = _by_identifier(COMPRESSORS, compression_id)[3](data)
+
+        return _by_identifier(SERIALIZERS, serializer_id)[3](data)
+
+
+def get_coder(config: CacheSettings) -> type[Coder]:
+    """
+    Create the coder selected by `CacheSettings.CODER` and `CacheSettings.COMPRESSION`.
+
+    The default configuration keeps the plain `JsonCoder`, so existing entries and key
+    layout are left untouched.
+
+    Args:
+        config: The cache configuration.
+
+    Returns:
+        A `Coder` class for `FastAPICache`.
+
+    Raises:
+        ValueError: If the serializer or compression is unknown, or its optional
+            dependency is not installed.
+    """
+    if config.CODER == 'json' and config.COMPRESSION == 'none':
+        return JsonCoder
+
+    for kind, name, registry in (
+        ('serializer', config.CODER, SERIALIZERS),
+        ('compression', config.COMPRESSION, COMPRESSORS),
+    ):
+        if name not in registry:
+            raise ValueError(f"Unknown cache {kind} '{name}'")
+        if name not in ('json', 'none') and registry[name][1] is None:
+            raise ValueError(f"The cache {kind} '{name}' is not installed")
+
+    return type(
+        'ConfiguredCoder',
+        (FramedCoder,),
+        {
+            'serializer': config.CODER,
+            'compression': config.COMPRESSION,
+            'compression_threshold': config.COMPRESSION_THRESHOLD,
+        },
+    )
@@ -0,0 +1,115 @@
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import HTTPException, Request, Response, status
+
+
+def make_etag(entity_id: uuid.UUID | str, updated_at: datetime) -> str:
+    """
+    Build a strong entity tag from an entity's identifier and modification time.
+
+    Args:
+        entity_id: The unique identifier of the entity.
+        updated_at: The timestamp when the entity was last updated.
+
+    Returns:
+        A quoted strong `ETag` value.
+    """
+    digest = hashlib.sha256(f"{entity_id}:{updated_at.isoformat()}".encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def as_utc(value: datetime) -> datetime:
+    """Interpret a naive database timestamp as UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def http_date(value: datetime) -> str:
+    """Format a timestamp as an HTTP date, e.g. for the `Last-Modified` header."""
+    return format_datetime(as_utc(value), usegmt=True)
+
+
+def _parse_etags(header: str) -> list[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def _strip_weak(etag: str) -> str:
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    """
+    Evaluate the `If-None-Match` and `If-Modified-Since` preconditions of a request.
+
+    `If-None-Match` takes precedence and uses the weak comparison function, as
+    described in RFC 9110. `If-Modified-Since` is only considered when
+    `If-None-Match` is absent, and is compared at a one second resolution.
+
+    Args:
+        request: The current HTTP request object.
+        etag: The current entity tag of the requested resource.
+        last_modified: The timestamp when the requested resource was last updated.
+
+    Returns:
+        True if the client's copy is still fresh and a 304 should be served.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = _parse_etags(if_none_match)
+        return "*" in tags or _strip_weak(etag) in map(_strip_weak, tags)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return as_utc(last_modified).replace(microsecond=0) <= since
+
+    return False
+
+
+def check_if_match(request: Request, etag: str) -> None:
+    """
+    Evaluate the `If-Match` precondition of a request for optimistic concurrency.
+
+    Args:
+        request: The current HTTP request object.
+        etag: The current entity tag of the targeted resource.
+
+    Raises:
+        HTTPException: Status code 412 if the `If-Match` header is present and does
+            not match the current entity tag using the strong comparison function.
+    """
+    if_match = request.headers.get("if-match")
+    if if_match is None:
+        return
+
+    tags = _parse_etags(if_match)
+    if "*" in tags:
+        return
+    if etag.startswith("W/") or etag not in tags:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="The resource has been modified",
+        )
+
+
+def set_validators(response: Response, etag: str, last_modified: datetime) -> None:
+    """Set the `ETag`, `Last-Modified` and `Cache-Control` headers on a response."""
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    response.headers["Cache-Control"] = "private, no-cache"
+
+
+def not_modified_response(etag: str, last_modified: datetime) -> Response:
+    """Build an empty 304 response carrying the resource's validators."""
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
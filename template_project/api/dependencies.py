@@ -1,7 +1,11 @@
+from typing import Callable, Iterator
+
 from fastapi import Depends
+from sqlmodel import Session
 
 from template_project.api.auth import verify_jwt_token
-from template_project.db.factories import get_db_session
+from template_project.db.factories import SessionPolicy, get_db_session
+from template_project.db.sharding import get_shard_router
 
 
 def get_session():
@@ -22,7 +26,8 @@ def get_session_by_user(payload: dict = Depends(verify_jwt_token)):
     Provide a database session for use in `FastAPI` endpoints.
 
     Intended for use with `FastAPI`'s dependency injection system to provide a database
-    session where authentication is required.
+    session where authentication is required. The session is bound to the shard holding
+    the authenticated user.
 
     Args:
         payload: Utilizes `FastAPI`'s dependency injection to ensure that a valid JWT
@@ -31,4 +36,46 @@ def get_session_by_user(payload: dict = Depends(verify_jwt_token)):
     Yields:
         A `SQLModel` session object for interacting with the database.
     """
-    yield from get_db_session()
+    yield from _get_user_session(payload)
+
+
+def _get_user_session(
+    payload: dict, policy: SessionPolicy | None = None
+) -> Iterator[Session]:
+    router = get_shard_router()
+    shard = router.shard_for_user(payload['sub'])
+    yield from get_db_session(router.get_engine(shard), policy)
+
+
+def session_with_policy(policy: SessionPolicy) -> Callable[..., Iterator[Session]]:
+    """
+    Create a dependency providing a database session with a transaction policy.
+
+    Usage:
+        ```python
+        @router.get("/")
+        async def example(
+            session: Session = Depends(session_with_policy(READ_ONLY)),
+        ):
+            pass
+        ```
+    """
+
+    def get_session_with_policy():
+        yield from get_db_session(policy=policy)
+
+    return get_session_with_policy
+
+
+def user_session_with_policy(
+    policy: SessionPolicy,
+) -> Callable[..., Iterator[Session]]:
+    """
+    Create a dependency providing a database session with a transaction policy, bound
+    to the shard of the authenticated user, see `get_session_by_user`.
+    """
+
+    def get_session_by_user_with_policy(payload: dict = Depends(verify_jwt_token)):
+        yield from _get_user_session(payload, policy)
+
+    return get_session_by_user_with_policy
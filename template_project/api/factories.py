@@ -5,19 +5,49 @@ from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from template_project.api.cache import initialise_cache
+from template_project.api.cache import close_cache, initialise_cache
 from template_project.api.exceptions import EntityNotFoundException
+from template_project.api.health import health_checker
+from template_project.api.last_login import last_logins
+from template_project.api.lifecycle import delay_shutdown, prewarm_pool
+from template_project.api.middleware import AccessLogMiddleware
 from template_project.api.routers import accounts, system
-from template_project.config import APISettings
+from template_project.api.warmup import save_snapshot, warm_up
+from template_project.config import (
+    APISettings,
+    CacheSettings,
+    DatabaseSettings,
+    LoggingSettings,
+)
+from template_project.db.factories import dispose_engine
+from template_project.db.sharding import get_shard_router
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.deployed_at = datetime.now(timezone.utc)
+    db_config = DatabaseSettings()  # type: ignore
 
     initialise_cache()
+    if db_config.POOL_PREWARM:
+        await prewarm_pool(db_config.POOL_SIZE)
+    if CacheSettings().WARMUP_ENABLED:
+        await warm_up()
+    last_logins.start()
+    await health_checker.start()
+    app.state.ready = True
+    delay_shutdown(app, APISettings().SHUTDOWN_DELAY)  # type: ignore
     yield
 
+    # uvicorn only runs the shutdown once in-flight requests completed, or after
+    # `API_DRAIN_TIMEOUT` seconds
+    await health_checker.stop()
+    await last_logins.stop()
+    await save_snapshot()
+    await close_cache()
+    get_shard_router().dispose()
+    dispose_engine()
+
 
 def entity_not_found_exception_handler(
     request: Request, exc: EntityNotFoundException
@@ -41,11 +71,13 @@ def create_api_application() -> FastAPI:
 
     Middleware:
         - `CORSMiddleware` to handle CORS. CORS origins are set up in the environment.
+        - `AccessLogMiddleware` to log requests, when enabled in the environment.
 
     Exception Handlers:
         - Adds a custom exception handler for `EntityNotFoundException`.
     """
     api_config = APISettings()  # type: ignore
+    logging_config = LoggingSettings()
 
     if api_config.DOCS_ENABLED:
         docs_url = '/docs'
@@ -55,6 +87,7 @@ def create_api_application() -> FastAPI:
         redoc_url = None
 
     app = FastAPI(lifespan=lifespan, docs_url=docs_url, redoc_url=redoc_url)
+    app.state.ready = False
 
     app.add_middleware(
         CORSMiddleware,
@@ -64,6 +97,12 @@ def create_api_application() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if logging_config.ACCESS_LOG:
+        app.add_middleware(
+            AccessLogMiddleware,
+            sample_rate=logging_config.ACCESS_SAMPLE_RATE,
+            slow_threshold=logging_config.ACCESS_SLOW_THRESHOLD,
+        )
 
     # include routers here
     app.include_router(system.router)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import text
+
+from template_project.api.cache import call_redis, get_redis_client
+from template_project.config import APISettings
+from template_project.db.factories import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+def _ping_postgres() -> None:
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+async def check_postgres() -> None:
+    """Check that PostgreSQL answers a query."""
+    await asyncio.to_thread(_ping_postgres)
+
+
+async def check_redis() -> None:
+    """Check that Redis answers a ping, through the circuit breaker of the cache."""
+    client = get_redis_client()
+    if client:
+        await call_redis(client.ping)
+
+
+class HealthChecker:
+    """
+    Background checker of the dependencies of the application.
+
+    Every check runs every `interval` seconds in a background task, and probes are
+    served from the last results, so their frequency has no effect on the load of the
+    dependencies. A check not completing within `timeout` seconds is reported as
+    failing, and is not started again until it completes, so a hung dependency never
+    piles up connections or threads.
+
+    Only the required checks decide whether the application is healthy. Optional
+    checks, such as the cache which the application can serve without, are reported
+    without taking every instance out of the load balancer at once when they fail.
+
+    Args:
+        interval: The time between checks in seconds.
+        timeout: The maximum duration of a check in seconds.
+    """
+
+    def __init__(self, interval: float, timeout: float):
+        self.interval = interval
+        self.timeout = timeout
+        self.checks: dict[str, Callable[[], Awaitable[None]]] = {}
+        self.optional: set[str] = set()
+        self.results: dict[str, dict[str, Any]] = {}
+        self.checked_at = 0.0
+        self._running: dict[str, asyncio.Task] = {}
+        self._task: asyncio.Task | None = None
+
+    async def _check(self, name: str, check: Callable[[], Awaitable[None]]) -> None:
+        started = time.perf_counter()
+
+        task = self._running.get(name)
+        if task is None or task.done():
+            task = self._running[name] = asyncio.create_task(check())
+        done, _ = await asyncio.wait({task}, timeout=self.timeout)
+
+        error = None
+        if not done:
+            error = f"Timed out after {self.timeout}s"
+        elif task.exception():
+            error = repr(task.exception())
+
+        result = self.results.setdefault(name, {'last_error': None})
+        result['healthy'] = error is None
+        result['required'] = name not in self.optional
+        result['latency_ms'] = round((time.perf_counter() - started) * 1000, 2)
+        result['checked_at'] = datetime.now(timezone.utc).isoformat()
+        if error:
+            result['last_error'] = error
+            result['last_error_at'] = result['checked_at']
+            logger.warning(f"Health check {name} failed: {error}")
+
+    async def run_checks(self) -> None:
+        """Run every check once, concurrently."""
+        await asyncio.gather(
+            *(self._check(name, check) for name, check in self.checks.items())
+        )
+        self.checked_at = time.monotonic()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_checks()
+
+    def is_healthy(self) -> bool:
+        """
+        Whether every required check passed, and the results are recent.
+
+        Results older than three intervals mean the checker itself is stuck, and count
+        as unhealthy.
+        """
+        required = self.checks.keys() - self.optional
+        if not self.checks or not required <= self.results.keys():
+            return False
+        if time.monotonic() - self.checked_at > 3 * self.interval:
+            return False
+        return all(self.results[name]['healthy'] for name in required)
+
+    async def start(self) -> None:
+        """Run the checks, and keep running them in the background."""
+        self.checks = {'postgres': check_postgres}
+        if get_redis_client():
+            # The cache is skipped while Redis is unavailable
+            self.checks['redis'] = check_redis
+            self.optional = {'redis'}
+        await self.run_checks()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop checking in the background."""
+        tasks = [task for task in [self._task, *self._running.values()] if task]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running = {}
+
+
+_api_config = APISettings()  # type: ignore
+
+health_checker = HealthChecker(
+    interval=_api_config.HEALTH_CHECK_INTERVAL,
+    timeout=_api_config.HEALTH_CHECK_TIMEOUT,
+)
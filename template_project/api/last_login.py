@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timezone
+from itertools import islice
+
+from template_project.config import APISettings
+from template_project.db.controllers import accounts
+from template_project.db.sharding import get_shard_router
+
+logger = logging.getLogger(__name__)
+
+
+def _write(logins: dict[uuid.UUID, datetime]) -> None:
+    accounts.update_sharded_last_logins(router=get_shard_router(), logins=logins)
+
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for the last login time of users.
+
+    Logins are kept in memory, coalesced per user, and written in bulk by a background
+    task every `flush_interval` seconds, or as soon as `flush_size` users are pending.
+    Each statement updates at most `flush_size` users. Failed batches are kept for the
+    next flush, and logins are dropped once `max_pending` users are waiting, so an
+    unavailable database never exhausts the memory of the worker.
+
+    Args:
+        flush_interval: The maximum delay in seconds before a login is written.
+        flush_size: The number of pending users that triggers a flush, and the maximum
+            number of users updated by a single statement.
+        max_pending: The maximum number of pending users.
+    """
+
+    def __init__(self, flush_interval: float, flush_size: int, max_pending: int):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.max_pending = max_pending
+        self.pending: dict[uuid.UUID, datetime] = {}
+        self.dropped = 0
+        self.failed = False
+        self._wakeup: asyncio.Event | None = None
+        self._stopping: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    def record(self, user_id: uuid.UUID, logged_in_at: datetime | None = None) -> None:
+        """Record a login, to be written by the next flush."""
+        # database timestamps are naive UTC
+        logged_in_at = logged_in_at or datetime.now(timezone.utc).replace(tzinfo=None)
+
+        previous = self.pending.get(user_id)
+        if previous is None and len(self.pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        if previous is None or logged_in_at > previous:
+            self.pending[user_id] = logged_in_at
+
+        if self._wakeup and len(self.pending) >= self.flush_size:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Write the pending logins to the database.
+
+        Returns:
+            The number of users written.
+        """
+        async with self._lock:
+            pending, self.pending = self.pending, {}
+            logins = iter(pending.items())
+            written = 0
+
+            while batch := dict(islice(logins, self.flush_size)):
+                try:
+                    await asyncio.to_thread(_write, batch)
+                except asyncio.CancelledError:
+                    self._restore([*batch.items(), *logins])
+                    raise
+                except Exception:
+                    logger.warning("Error writing last logins:", exc_info=True)
+                    self.failed = True
+                    self._restore([*batch.items(), *logins])
+                    break
+                written += len(batch)
+                self.failed = False
+
+            if self.dropped:
+                logger.warning(f"Dropped {self.dropped} last logins, buffer full")
+                self.dropped = 0
+
+            return written
+
+    def _restore(self, logins: list[tuple[uuid.UUID, datetime]]) -> None:
+        # keep unwritten logins for the next flush, newest login wins
+        for user_id, logged_in_at in logins:
+            if logged_in_at > self.pending.get(user_id, datetime.min):
+                self.pending[user_id] = logged_in_at
+
+    async def _run(self) -> None:
+        assert self._wakeup and self._stopping
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._stopping.is_set():
+                break
+            await self.flush()
+            if self.failed:
+                # do not retry on every login while the database is unavailable
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop flushing in the background, and write the remaining logins.
+
+        A flush in progress is completed rather than cancelled, so none of its batches
+        are lost.
+        """
+        if self._task and self._wakeup and self._stopping:
+            self._stopping.set()
+            self._wakeup.set()
+            await self._task
+            self._task = None
+            self._wakeup = None
+            self._stopping = None
+
+        written = await self.flush()
+        if self.pending:
+            logger.error(f"Lost {len(self.pending)} last logins on shutdown")
+        elif written:
+            logger.info(f"Wrote {written} last logins on shutdown")
+
+
+_api_config = APISettings()  # type: ignore
+
+last_logins = LastLoginBuffer(
+    flush_interval=_api_config.LAST_LOGIN_FLUSH_INTERVAL,
+    flush_size=_api_config.LAST_LOGIN_FLUSH_SIZE,
+    max_pending=_api_config.LAST_LOGIN_MAX_PENDING,
+)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import signal
+import threading
+import time
+
+from fastapi import FastAPI
+
+from template_project.db.factories import get_engine
+
+logger = logging.getLogger(__name__)
+
+
+async def prewarm_pool(size: int) -> int:
+    """
+    Open `size` database connections in parallel and return them to the pool.
+
+    The pool keeps up to `POOL_SIZE` idle connections, so the first requests after a
+    deploy do not pay for connection and TLS setup.
+
+    Args:
+        size: The number of connections to open.
+
+    Returns:
+        The number of connections opened.
+    """
+    engine = get_engine()
+    started = time.monotonic()
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(engine.connect) for _ in range(size)),
+        return_exceptions=True,
+    )
+    connections = [
+        result for result in results if not isinstance(result, BaseException)
+    ]
+    for connection in connections:
+        connection.close()
+
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        logger.warning("Error pre-warming the connection pool:", exc_info=errors[0])
+    logger.info(
+        f"Pre-warmed {len(connections)} of {size} database connections "
+        f"in {time.monotonic() - started:.2f}s"
+    )
+    return len(connections)
+
+
+def delay_shutdown(app: FastAPI, delay: float) -> None:
+    """
+    Report the application as not ready as soon as the server receives `SIGTERM`.
+
+    The server's own handler runs `delay` seconds later, so requests are still served
+    while load balancers notice the failing readiness checks and stop routing new
+    requests. The graceful shutdown of the server then drains the in-flight requests.
+
+    The handler is only installed from the main thread, and when the server already
+    handles `SIGTERM`, as uvicorn does before starting the application.
+
+    Args:
+        app: The application, whose `state.ready` is cleared.
+        delay: The delay in seconds before the server shuts down.
+    """
+    if delay <= 0 or threading.current_thread() is not threading.main_thread():
+        return
+
+    shutdown = signal.getsignal(signal.SIGTERM)
+    if not callable(shutdown):
+        return
+
+    loop = asyncio.get_running_loop()
+
+    def handle_sigterm(sig, frame):
+        if not app.state.ready:
+            # already shutting down, or signalled again
+            shutdown(sig, frame)
+            return
+        app.state.ready = False
+        logger.info(f"Shutting down in {delay:g}s, no longer ready")
+        loop.call_soon_threadsafe(loop.call_later, delay, shutdown, sig, frame)
+
+    signal.signal(signal.SIGTERM, handle_sigterm)
@@ -0,0 +1,71 @@
+import logging
+import random
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from template_project.db.timing import query_time
+
+access_logger = logging.getLogger('template_project.access')
+
+
+class AccessLogMiddleware:
+    """
+    ASGI middleware logging one structured record per HTTP request.
+
+    Each record contains the method, path, query string, route template, status code,
+    latency and the time spent in database queries. Successful requests are sampled at
+    `sample_rate`, while errors and requests slower than `slow_threshold` seconds are
+    always logged.
+
+    Args:
+        app: The ASGI application.
+        sample_rate: The fraction of successful requests to log, from 0 to 1.
+        slow_threshold: The latency in seconds above which requests are always logged.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = 1, slow_threshold: float = 1):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        started = time.perf_counter()
+        db_time = [0.0]
+        token = query_time.set(db_time)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency = time.perf_counter() - started
+            query_time.reset(token)
+
+            if (
+                status_code >= 400
+                or latency >= self.slow_threshold
+                or random.random() < self.sample_rate
+            ):
+                route = scope.get('route')
+                access_logger.info(
+                    f"{scope['method']} {scope['path']} {status_code}",
+                    extra={
+                        'method': scope['method'],
+                        'path': scope['path'],
+                        'query': scope.get('query_string', b'').decode('latin-1'),
+                        'route': getattr(route, 'path', None),
+                        'status': status_code,
+                        'latency_ms': round(latency * 1000, 2),
+                        'db_ms': round(db_time[0] * 1000, 2),
+                    },
+                )
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+from typing import Any
+
+# Only one profiling session may run per worker at a time. The lock is released by the
+# profiling thread, which keeps running when the request is cancelled.
+profile_lock = threading.Lock()
+
+# Frame of a sampled stack: (function name, file, line)
+Frame = tuple[str, str, int]
+
+
+def _walk(frame: FrameType | None) -> list[Frame]:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, frame.f_lineno))
+        frame = frame.f_back
+    stack.reverse()
+    return stack
+
+
+def sample_stacks(
+    seconds: float, interval: float
+) -> tuple[Counter[tuple[Frame, ...]], int]:
+    """
+    Sample the stacks of every thread of the process at a fixed interval.
+
+    Only the Python frames of the other threads are read, through
+    `sys._current_frames()`, so the profiled code is neither instrumented nor slowed
+    down beyond the brief pauses of the sampling thread holding the GIL.
+
+    Args:
+        seconds: The duration of the profile in seconds.
+        interval: The time between samples in seconds.
+
+    Returns:
+        The number of times each stack was sampled, and the number of samples. The
+        first frame of each stack is the thread name.
+    """
+    stacks: Counter[tuple[Frame, ...]] = Counter()
+    own = threading.get_ident()
+    deadline = time.monotonic() + seconds
+    samples = 0
+
+    while time.monotonic() < deadline:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            thread = (names.get(ident, str(ident)), '', 0)
+            stacks[(thread, *_walk(frame))] += 1
+        samples += 1
+        time.sleep(interval)
+
+    return stacks, samples
+
+
+def _label(frame: Frame) -> str:
+    name, filename, line = frame
+    if not filename:
+        return name
+    return f"{name} ({Path(filename).name}:{line})"
+
+
+def to_collapsed(stacks: Counter[tuple[Frame, ...]]) -> str:
+    """Format stacks in the collapsed format of `flamegraph.pl` and similar tools."""
+    return "".join(
+        f"{';'.join(_label(frame) for frame in stack)} {count}\n"
+        for stack, count in stacks.most_common()
+    )
+
+
+def to_speedscope(
+    stacks: Counter[tuple[Frame, ...]], interval: float, name: str
+) -> dict[str, Any]:
+    """Format stacks as a sampled profile in the speedscope file format."""
+    frames: dict[Frame, int] = {}
+    samples, weights = [], []
+    for stack, count in stacks.items():
+        samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+        weights.append(count * interval)
+
+    return {
+        '$schema': 'https://www.speedscope.app/file-format-schema.json',
+        'name': name,
+        'exporter': 'template-project',
+        'shared': {
+            'frames': [
+                (
+                    {'name': frame[0], 'file': frame[1], 'line': frame[2]}
+                    if frame[1]
+                    else {'name': frame[0]}
+                )
+                for frame in frames
+            ]
+        },
+        'profiles': [
+            {
+                'type': 'sampled',
+                'name': name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            }
+        ],
+    }
+
+
+def _profile(
+    seconds: float, interval: float, memory: bool, memory_limit: int
+) -> tuple[Counter[tuple[Frame, ...]], int, list[dict[str, Any]] | None]:
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    before = tracemalloc.take_snapshot() if memory else None
+
+    try:
+        stacks, samples = sample_stacks(seconds, interval)
+
+        allocations = None
+        if before is not None:
+            after = tracemalloc.take_snapshot()
+            allocations = [
+                {
+                    'location': str(stat.traceback),
+                    'size_diff': stat.size_diff,
+                    'size': stat.size,
+                    'count_diff': stat.count_diff,
+                }
+                for stat in after.compare_to(before, 'lineno')[:memory_limit]
+            ]
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+    return stacks, samples, allocations
+
+
+async def profile_worker(
+    seconds: float,
+    interval: float,
+    output: str = 'collapsed',
+    memory: bool = False,
+    memory_limit: int = 50,
+) -> dict[str, Any]:
+    """
+    Profile this worker with a sampling profiler running in a dedicated thread.
+
+    Args:
+        seconds: The duration of the profile in seconds.
+        interval: The time between samples in seconds.
+        output (optional): Either `collapsed` or `speedscope`. Defaults to `collapsed`.
+        memory (optional): Whether to also trace allocations with `tracemalloc`, and
+            return the allocation growth during the profile. Tracing slows down
+            allocations noticeably while it runs. Defaults to False.
+        memory_limit (optional): The number of allocation sites returned. Defaults
+            to 50.
+
+    Returns:
+        The number of samples, the profile in the requested format, and the
+        allocation growth by source line when requested.
+
+    Raises:
+        RuntimeError: If a profile is already running on this worker.
+    """
+    if not profile_lock.acquire(blocking=False):
+        raise RuntimeError("A profile is already running on this worker")
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result: Any, error: BaseException | None) -> None:
+        if future.done():
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def run() -> None:
+        try:
+            result = _profile(seconds, interval, memory, memory_limit)
+        except Exception as exc:
+            loop.call_soon_threadsafe(resolve, None, exc)
+        else:
+            loop.call_soon_threadsafe(resolve, result, None)
+        finally:
+            profile_lock.release()
+
+    try:
+        threading.Thread(target=run, name='profiler', daemon=True).start()
+    except Exception:
+        profile_lock.release()
+        raise
+    stacks, samples, allocations = await future
+
+    if output == 'speedscope':
+        profile: Any = to_speedscope(stacks, interval, name=f"worker {os.getpid()}")
+    else:
+        profile = to_collapsed(stacks)
+
+    return {'samples': samples, 'profile': profile, 'memory': allocations}
@@ -1,13 +1,40 @@
+import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel import Session
 
-from template_project.api.auth import verify_jwt_token
-from template_project.api.dependencies import get_session, get_session_by_user
+from template_project.api.auth import verify_api_token, verify_jwt_token
+from template_project.api.cache import (
+    get_cached_user,
+    get_cached_user_ids,
+    get_cached_users,
+    invalidate_cached_user,
+    set_cached_user,
+    set_cached_users,
+    to_cached_user,
+)
+from template_project.api.conditional import (
+    check_if_match,
+    is_not_modified,
+    make_etag,
+    not_modified_response,
+    set_validators,
+)
+from template_project.api.dependencies import (
+    get_session_by_user,
+    user_session_with_policy,
+)
+from template_project.api.last_login import last_logins
+from template_project.api.warmup import record_access
+from template_project.config import APISettings
 from template_project.db.controllers import accounts
+from template_project.db.factories import AUTOCOMMIT, READ_ONLY, SessionPolicy
+from template_project.db.sharding import ShardRouter, get_shard_router
 from template_project.models.validation import (
     TokenResponse,
+    UserBatchRequest,
+    UserBatchResponse,
     UserCreate,
     UserLogin,
     UserPublic,
@@ -15,6 +42,16 @@ from template_project.models.validation import (
 )
 from template_project.security import create_access_token
 
+api_settings = APISettings()  # type: ignore
+
+# Read-only lookups, with a tighter statement timeout than the connection default
+search_policy = SessionPolicy(
+    read_only=True, statement_timeout=api_settings.SEARCH_STATEMENT_TIMEOUT
+)
+batch_policy = SessionPolicy(
+    read_only=True, statement_timeout=api_settings.BATCH_STATEMENT_TIMEOUT
+)
+
 router = APIRouter(
     prefix="",
     tags=["accounts"],
@@ -23,15 +60,14 @@ router = APIRouter(
 
 @router.post("/signup", status_code=status.HTTP_201_CREATED, response_model=UserPublic)
 async def register_user(
-    body: UserCreate, session: Session = Depends(get_session)
+    body: UserCreate, router: ShardRouter = Depends(get_shard_router)
 ) -> Any:
-    user = accounts.get_user_by_email(session=session, email=body.email)
-    if user:
+    new_user = accounts.create_sharded_user(router=router, user_in=body)
+    if not new_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
             detail="The user with this email already exists in the system",
         )
-    new_user = accounts.create_user(session=session, user_in=body)
 
     return new_user
 
@@ -39,10 +75,10 @@ async def register_user(
 @router.post("/login")
 async def user_login(
     body: UserLogin,
-    session: Session = Depends(get_session),
+    router: ShardRouter = Depends(get_shard_router),
 ) -> TokenResponse:
-    user = accounts.authenticate_user(
-        session=session, email=body.email, password=body.password
+    user = accounts.authenticate_sharded_user(
+        router=router, email=body.email, password=body.password, policy=READ_ONLY
     )
 
     if not user:
@@ -51,6 +87,7 @@ async def user_login(
             detail="Incorrect email or password",
         )
 
+    last_logins.record(user.id)
     token = create_access_token(subject=user.id)
 
     return TokenResponse(access_token=token)
@@ -58,27 +95,44 @@ async def user_login(
 
 @router.get("/accounts/me", response_model=UserPublic)
 async def get_user_me(
-    session: Session = Depends(get_session_by_user),
+    request: Request,
+    response: Response,
+    session: Session = Depends(user_session_with_policy(AUTOCOMMIT)),
     payload: dict = Depends(verify_jwt_token),
 ) -> Any:
-    user = accounts.get_user_by_id(session=session, user_id=payload['sub'])
+    cached = await get_cached_user(payload['sub'])
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    if not cached:
+        user = accounts.get_user_by_id(session=session, user_id=payload['sub'])
+
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
 
-    return user
+        cached = to_cached_user(user)
+        await set_cached_user(cached)
+
+    record_access(cached.user.id)
+    if is_not_modified(request, cached.etag, cached.last_modified):
+        return not_modified_response(cached.etag, cached.last_modified)
+
+    set_validators(response, cached.etag, cached.last_modified)
+    return cached.user
 
 
 @router.patch("/accounts/me", response_model=UserPublic)
 async def update_user_me(
+    request: Request,
+    response: Response,
     body: UserUpdate,
     session: Session = Depends(get_session_by_user),
     payload: dict = Depends(verify_jwt_token),
 ) -> Any:
-    user = accounts.update_user(session=session, user_in=body, user_id=payload['sub'])
+    user = accounts.get_user_by_id(
+        session=session, user_id=payload['sub'], for_update=True
+    )
 
     if not user:
         raise HTTPException(
@@ -86,4 +140,80 @@ async def update_user_me(
             detail="User not found",
         )
 
-    return user
+    check_if_match(request, make_etag(user.id, user.updated_at))
+
+    user = accounts.update_user(session=session, user_in=body, user_id=user.id)
+    updated = to_cached_user(user)
+
+    # Commit before invalidating, or a concurrent read could cache the old row again
+    session.commit()
+    await invalidate_cached_user(updated.user.id)
+
+    set_validators(response, updated.etag, updated.last_modified)
+    return updated.user
+
+
+@router.post("/accounts/batch", response_model=UserBatchResponse)
+async def get_users_batch(
+    body: UserBatchRequest,
+    router: ShardRouter = Depends(get_shard_router),
+    _: bool = Depends(verify_api_token),
+) -> Any:
+    if len(body.ids) + len(body.emails) > api_settings.BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {api_settings.BATCH_MAX_SIZE} ids and emails are allowed",
+        )
+
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in body.ids))
+    emails = list(dict.fromkeys(email.lower() for email in body.emails))
+
+    email_ids = await get_cached_user_ids(emails)
+    found = await get_cached_users(
+        list(dict.fromkeys(user_ids + [*email_ids.values()]))
+    )
+
+    missing_ids = [user_id for user_id in user_ids if user_id not in found]
+    missing_emails = [email for email in emails if email_ids.get(email) not in found]
+
+    if missing_ids or missing_emails:
+        entries = [
+            to_cached_user(user)
+            for user in accounts.get_sharded_users(
+                router=router,
+                user_ids=[uuid.UUID(user_id) for user_id in missing_ids],
+                emails=missing_emails,
+                policy=batch_policy,
+            )
+        ]
+        await set_cached_users(entries)
+        found.update((str(cached.user.id), cached) for cached in entries)
+        email_ids.update(
+            (cached.user.email.lower(), str(cached.user.id)) for cached in entries
+        )
+
+    users = {}
+    for user_id in user_ids + [email_ids.get(email) for email in emails]:
+        if user_id in found:
+            users.setdefault(user_id, found[user_id].user)
+
+    record_access(*users)
+    return UserBatchResponse(
+        users=list(users.values()),
+        not_found_ids=[user_id for user_id in user_ids if user_id not in found],
+        not_found_emails=[
+            email for email in emails if email_ids.get(email) not in found
+        ],
+    )
+
+
+@router.get("/accounts/search", response_model=list[UserPublic])
+async def search_users(
+    q: str = Query(min_length=3, max_length=255),
+    limit: int = Query(20, ge=1, le=api_settings.SEARCH_MAX_RESULTS),
+    router: ShardRouter = Depends(get_shard_router),
+    _: bool = Depends(verify_api_token),
+) -> Any:
+    return accounts.search_sharded_users(
+        router=router, query=q, limit=limit, policy=search_policy
+    )
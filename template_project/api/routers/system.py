@@ -1,8 +1,27 @@
-from fastapi import APIRouter, Depends, Query, Request
+import logging
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
+from redis.exceptions import RedisError
 
 from template_project.api.auth import verify_api_token
+from template_project.api.breaker import CircuitOpenError
+from template_project.api.cache import (
+    call_redis,
+    clear_namespace,
+    get_breaker,
+    get_redis_client,
+    invalidate_tags,
+)
+from template_project.api.health import health_checker
+from template_project.api.profiler import profile_worker
+from template_project.config import APISettings
+
+logger = logging.getLogger(__name__)
+
+api_settings = APISettings()  # type: ignore
 
 router = APIRouter(
     prefix="",
@@ -19,25 +38,87 @@ def health(request: Request) -> dict:
     }
 
 
+@router.get("/live")
+def live() -> dict:
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready(request: Request, response: Response) -> dict:
+    is_ready = request.app.state.ready and health_checker.is_healthy()
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {
+        "status": "ok" if is_ready else "unavailable",
+        "accepting_requests": request.app.state.ready,
+        "checks": health_checker.results,
+    }
+
+
 @router.get("/clear-cache")
 async def clear(
     namespace: str = Query(None),
+    tag: list[str] = Query(None),
     _: dict = Depends(verify_api_token),
 ):
-    return await FastAPICache.clear(namespace)
+    try:
+        if tag:
+            return await invalidate_tags(*tag)
+        return await clear_namespace(namespace)
+    except CircuitOpenError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        )
 
 
 @router.get("/cache-info")
 async def cache_info(_: dict = Depends(verify_api_token)) -> dict:
-    backend = FastAPICache.get_backend()
+    client = get_redis_client()
+    breaker = get_breaker()
 
     info = None
-    if isinstance(backend, RedisBackend):
-        info = await backend.redis.info()
+    if client and breaker:
+        try:
+            info = await call_redis(client.info)
+        except (CircuitOpenError, *breaker.failure_exceptions):
+            # the failure is reported in the state of the breaker
+            pass
+        except RedisError:
+            logger.warning("Error retrieving Redis info:", exc_info=True)
 
     return {
         'prefix': FastAPICache.get_prefix(),
         'enabled': FastAPICache.get_enable(),
         'expiration': FastAPICache.get_expire(),
+        'coder': FastAPICache.get_coder().__name__,
         'cache_info': info,
+        'circuit_breaker': breaker.info() if breaker else None,
     }
+
+
+@router.get("/profile")
+async def profile(
+    seconds: float = Query(10, gt=0, le=api_settings.PROFILE_MAX_SECONDS),
+    interval: float = Query(0.01, ge=0.001, le=1),
+    output: str = Query('collapsed', pattern='^(collapsed|speedscope)$'),
+    memory: bool = Query(False),
+    _: dict = Depends(verify_api_token),
+) -> Any:
+    """
+    Profile the worker serving the request, with a sampling profiler.
+
+    Return the stacks in collapsed format as plain text, or as speedscope JSON. With
+    `memory`, the response is a JSON object holding the profile and the allocation
+    growth traced with `tracemalloc`.
+    """
+    try:
+        result = await profile_worker(seconds, interval, output=output, memory=memory)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc))
+
+    if memory:
+        return result
+    if output == 'collapsed':
+        return PlainTextResponse(result['profile'])
+    return result['profile']
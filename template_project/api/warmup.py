@@ -0,0 +1,174 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from fastapi_cache import FastAPICache
+
+from template_project.api.cache import (
+    get_redis_client,
+    set_cached_users,
+    to_cached_user,
+)
+from template_project.config import CacheSettings
+from template_project.db.controllers import accounts
+from template_project.db.factories import READ_ONLY
+from template_project.db.sharding import get_shard_router
+from template_project.models.validation import CachedUser
+
+logger = logging.getLogger(__name__)
+
+# Number of entity cache reads per user ID since the worker started
+access_counts: Counter[str] = Counter()
+
+# Access frequency statistics are kept for a day after the last snapshot
+STATS_EXPIRATION = 24 * 60 * 60
+
+# Number of user IDs tracked per hot key kept for the warm-up
+TRACKED_KEYS_FACTOR = 10
+
+_max_tracked = CacheSettings().WARMUP_KEYS * TRACKED_KEYS_FACTOR
+
+
+def record_access(*user_ids: uuid.UUID | str) -> None:
+    """
+    Record reads of users, to find the hottest keys for the next warm-up.
+
+    Only IDs of existing users should be recorded. The counts are bounded: once more
+    than `TRACKED_KEYS_FACTOR` times the number of warm-up keys are tracked, only the
+    most read half is kept.
+    """
+    access_counts.update(str(user_id) for user_id in user_ids)
+
+    if len(access_counts) > _max_tracked:
+        hottest = access_counts.most_common(_max_tracked // 2)
+        access_counts.clear()
+        access_counts.update(dict(hottest))
+
+
+def stats_cache_key() -> str:
+    """Build the cache key of the sorted set holding user access frequencies."""
+    return ":".join([FastAPICache.get_prefix(), "warmup", "users"])
+
+
+async def save_snapshot() -> None:
+    """
+    Persist the hottest user IDs of this worker for the next warm-up.
+
+    Access counts are merged into a Redis sorted set shared by every worker, and
+    written to `CacheSettings.SNAPSHOT_PATH`, when configured.
+    """
+    cache_config = CacheSettings()
+    hottest = access_counts.most_common(cache_config.WARMUP_KEYS)
+    if not hottest:
+        return
+
+    client = get_redis_client()
+    if client:
+        key = stats_cache_key()
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for user_id, count in hottest:
+                    pipe.zincrby(key, count, user_id)
+                pipe.expire(key, STATS_EXPIRATION)
+                await pipe.execute()
+        except Exception:
+            logger.warning("Error saving access statistics to Redis:", exc_info=True)
+
+    if cache_config.SNAPSHOT_PATH:
+        path = Path(cache_config.SNAPSHOT_PATH)
+        path.write_text(json.dumps([user_id for user_id, _ in hottest]))
+
+    logger.info(f"Saved {len(hottest)} hot keys for the next cache warm-up")
+
+
+async def load_hot_user_ids(limit: int) -> list[str]:
+    """
+    Load the hottest user IDs, from Redis or from the snapshot file.
+
+    Args:
+        limit: The maximum number of user IDs to load.
+
+    Returns:
+        The user IDs, hottest first.
+    """
+    client = get_redis_client()
+    if client:
+        try:
+            user_ids = await client.zrevrange(stats_cache_key(), 0, limit - 1)
+        except Exception:
+            logger.warning("Error loading access statistics from Redis:", exc_info=True)
+            user_ids = []
+        if user_ids:
+            return [user_id.decode() for user_id in user_ids]
+
+    path = CacheSettings().SNAPSHOT_PATH
+    if path and Path(path).exists():
+        return json.loads(Path(path).read_text())[:limit]
+
+    return []
+
+
+def _load_users(user_ids: list[str]) -> list[CachedUser]:
+    users = accounts.get_sharded_users(
+        router=get_shard_router(),
+        user_ids=[uuid.UUID(user_id) for user_id in user_ids],
+        policy=READ_ONLY,
+    )
+    return [to_cached_user(user) for user in users]
+
+
+async def warm_up() -> int:
+    """
+    Preload the hottest users into the entity cache.
+
+    Load the users from the database in batches, with at most
+    `CacheSettings.WARMUP_CONCURRENCY` batches in flight. Batches that have not
+    completed within `CacheSettings.WARMUP_TIMEOUT` seconds are abandoned, so a slow
+    database never holds the worker back for longer than the time budget.
+
+    Returns:
+        The number of users loaded into the cache.
+    """
+    cache_config = CacheSettings()
+    if not FastAPICache.get_enable():
+        return 0
+
+    started = time.monotonic()
+    user_ids = await load_hot_user_ids(cache_config.WARMUP_KEYS)
+    semaphore = asyncio.Semaphore(cache_config.WARMUP_CONCURRENCY)
+
+    async def warm_batch(batch: list[str]) -> int:
+        async with semaphore:
+            entries = await asyncio.to_thread(_load_users, batch)
+            await set_cached_users(entries)
+            return len(entries)
+
+    size = cache_config.WARMUP_BATCH_SIZE
+    tasks = [
+        asyncio.create_task(warm_batch(user_ids[i : i + size]))
+        for i in range(0, len(user_ids), size)
+    ]
+    if not tasks:
+        return 0
+
+    done, pending = await asyncio.wait(tasks, timeout=cache_config.WARMUP_TIMEOUT)
+    for task in pending:
+        task.cancel()
+
+    loaded = 0
+    for task in done:
+        if task.exception():
+            logger.warning("Cache warm-up batch failed:", exc_info=task.exception())
+        else:
+            loaded += task.result()
+
+    logger.info(
+        f"Cache warm-up loaded {loaded} of {len(user_ids)} users "
+        f"in {time.monotonic() - started:.2f}s"
+        + (f", {len(pending)} batches abandoned" if pending else "")
+    )
+    return loaded
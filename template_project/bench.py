@@ -0,0 +1,377 @@
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+PASSWORD = 'bench-password'
+
+# Percentiles included in the report
+PERCENTILES = {'p50': 50, 'p95': 95, 'p99': 99, 'p99.9': 99.9}
+
+
+@dataclass
+class Request:
+    """A request to send `offset` seconds after the start of the run."""
+
+    offset: float
+    operation: str
+    method: str
+    path: str
+    kwargs: dict[str, Any]
+
+
+@dataclass
+class Result:
+    """
+    The outcome of a request.
+
+    The latency is measured from the time the request was scheduled to start, not from
+    the time it was sent, so a stalled server is charged for the requests queued behind
+    it instead of hiding them (coordinated omission).
+    """
+
+    operation: str
+    latency: float | None
+    status: int | None = None
+    error: str | None = None
+
+
+@dataclass
+class BenchUser:
+    email: str
+    token: str
+
+
+def parse_mix(mix: str) -> dict[str, float]:
+    """
+    Parse an operation mix of the form `signup=1,login=2,me=7`.
+
+    Raises:
+        ValueError: If an operation is unknown or a weight is invalid.
+    """
+    weights = {}
+    for part in mix.split(','):
+        operation, _, weight = part.partition('=')
+        operation = operation.strip()
+        if operation not in ('signup', 'login', 'me'):
+            raise ValueError(f"Unknown operation '{operation}'")
+        weights[operation] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("The mix must contain an operation with a positive weight")
+    return weights
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Return the nearest-rank percentile of sorted values."""
+    # multiplying first keeps whole ranks exact, e.g. 99.9 / 100 * 1000 > 999
+    index = max(0, min(len(values) - 1, math.ceil(q * len(values) / 100) - 1))
+    return values[index]
+
+
+def summarize(results: list[Result], elapsed: float) -> dict[str, Any]:
+    """
+    Build the report of a run.
+
+    Args:
+        results: The outcomes of the requests.
+        elapsed: The duration of the run in seconds.
+
+    Returns:
+        The request count, throughput, error rate, errors by kind and latency
+        percentiles in milliseconds.
+    """
+    latencies = sorted(
+        result.latency for result in results if result.latency is not None
+    )
+    errors: dict[str, int] = {}
+    for result in results:
+        if result.error:
+            errors[result.error] = errors.get(result.error, 0) + 1
+        elif result.status and result.status >= 400:
+            errors[str(result.status)] = errors.get(str(result.status), 0) + 1
+
+    failed = sum(errors.values())
+    report: dict[str, Any] = {
+        'requests': len(results),
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round((len(results) - failed) / elapsed, 2) if elapsed else 0,
+        'error_rate': round(failed / len(results), 4) if results else 0,
+        'errors': errors,
+        'latency_ms': {},
+    }
+    if latencies:
+        report['latency_ms'] = {
+            name: round(percentile(latencies, q) * 1000, 2)
+            for name, q in PERCENTILES.items()
+        }
+        report['latency_ms']['mean'] = round(sum(latencies) / len(latencies) * 1000, 2)
+        report['latency_ms']['max'] = round(latencies[-1] * 1000, 2)
+
+    return report
+
+
+def report(results: list[Result], elapsed: float) -> dict[str, Any]:
+    """Build the report of a run, overall and by operation, see `summarize`."""
+    operations = sorted({result.operation for result in results})
+    return {
+        **summarize(results, elapsed),
+        'operations': {
+            operation: summarize(
+                [result for result in results if result.operation == operation],
+                elapsed,
+            )
+            for operation in operations
+        },
+    }
+
+
+async def _send(client: Any, request: Request, scheduled: float) -> Result:
+    try:
+        response = await client.request(request.method, request.path, **request.kwargs)
+    except Exception as exc:
+        return Result(
+            request.operation, time.perf_counter() - scheduled, error=type(exc).__name__
+        )
+    return Result(
+        request.operation, time.perf_counter() - scheduled, status=response.status_code
+    )
+
+
+async def run_open_loop(
+    client: Any, requests: Iterable[Request], max_in_flight: int
+) -> tuple[list[Result], float]:
+    """
+    Send requests on schedule, regardless of how fast the server responds.
+
+    Requests are never delayed by slow responses. When `max_in_flight` requests are
+    already waiting, a request is recorded as `dropped` instead, so an overloaded
+    client does not distort the results.
+
+    Args:
+        client: The `httpx.AsyncClient`.
+        requests: The requests, ordered by offset.
+        max_in_flight: The maximum number of concurrent requests.
+
+    Returns:
+        The outcomes of the requests and the duration of the run in seconds.
+    """
+    results: list[Result] = []
+    in_flight: set[asyncio.Task] = set()
+    started = time.perf_counter()
+
+    def done(task: asyncio.Task) -> None:
+        in_flight.discard(task)
+        results.append(task.result())
+
+    for request in requests:
+        scheduled = started + request.offset
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if len(in_flight) >= max_in_flight:
+            results.append(Result(request.operation, None, error='dropped'))
+            continue
+
+        task = asyncio.create_task(_send(client, request, scheduled))
+        in_flight.add(task)
+        task.add_done_callback(done)
+
+    if in_flight:
+        await asyncio.wait(in_flight)
+    return results, time.perf_counter() - started
+
+
+async def create_users(client: Any, count: int, run_id: str) -> list[BenchUser]:
+    """
+    Create users, and log them in, for the login and `/accounts/me` operations.
+
+    Raises:
+        RuntimeError: If a user cannot be created or logged in.
+    """
+    semaphore = asyncio.Semaphore(20)
+
+    async def create(index: int) -> BenchUser:
+        email = f'bench-{run_id}-{index}@example.com'
+        async with semaphore:
+            response = await client.post(
+                '/signup',
+                json={
+                    'email': email,
+                    'first_name': 'Bench',
+                    'last_name': f'User {index}',
+                    'password': PASSWORD,
+                },
+            )
+            if response.status_code != 201:
+                raise RuntimeError(f"Signup failed with {response.status_code}")
+            response = await client.post(
+                '/login', json={'email': email, 'password': PASSWORD}
+            )
+            if response.status_code != 200:
+                raise RuntimeError(f"Login failed with {response.status_code}")
+        return BenchUser(email=email, token=response.json()['access_token'])
+
+    return await asyncio.gather(*(create(index) for index in range(count)))
+
+
+def generate_mix(
+    weights: dict[str, float],
+    users: list[BenchUser],
+    rps: float,
+    duration: float,
+    run_id: str,
+    seed: int | None = None,
+    poisson: bool = False,
+) -> Iterator[Request]:
+    """
+    Generate the requests of an operation mix at a target rate.
+
+    Args:
+        weights: The relative weight of each operation.
+        users: The users used by the login and `/accounts/me` operations.
+        rps: The target number of requests per second.
+        duration: The duration of the run in seconds.
+        run_id: A unique identifier of the run, used in signup emails.
+        seed (optional): The seed of the random generator, for repeatable runs.
+        poisson (optional): Whether requests arrive as a Poisson process instead of at
+            a constant rate. Defaults to False.
+
+    Yields:
+        The requests, ordered by offset.
+    """
+    rng = random.Random(seed)
+    operations, operation_weights = list(weights), list(weights.values())
+    offset = 0.0
+    index = 0
+
+    while offset < duration:
+        operation = rng.choices(operations, weights=operation_weights)[0]
+        if operation == 'signup':
+            body = {
+                'email': f'bench-{run_id}-signup-{index}@example.com',
+                'first_name': 'Bench',
+                'last_name': f'Signup {index}',
+                'password': PASSWORD,
+            }
+            yield Request(offset, operation, 'POST', '/signup', {'json': body})
+        elif operation == 'login':
+            user = rng.choice(users)
+            body = {'email': user.email, 'password': PASSWORD}
+            yield Request(offset, operation, 'POST', '/login', {'json': body})
+        else:
+            user = rng.choice(users)
+            headers = {'Authorization': f'Bearer {user.token}'}
+            yield Request(
+                offset, operation, 'GET', '/accounts/me', {'headers': headers}
+            )
+
+        index += 1
+        offset += rng.expovariate(rps) if poisson else 1 / rps
+
+
+def read_access_log(
+    lines: Iterable[str],
+    speed: float = 1,
+    methods: Iterable[str] = ('GET', 'HEAD'),
+    headers: dict[str, str] | None = None,
+) -> Iterator[Request]:
+    """
+    Generate requests from NDJSON access logs, as written by `AccessLogMiddleware`.
+
+    Requests keep their recorded spacing, divided by `speed`. Request bodies are not
+    recorded, so only requests using one of `methods` are replayed.
+
+    Args:
+        lines: The log lines. Lines that are not access log records are skipped.
+        speed (optional): The replay speed factor. Defaults to 1.
+        methods (optional): The methods of the requests to replay. Defaults to GET
+            and HEAD.
+        headers (optional): Headers added to every request, e.g. an authorization.
+
+    Yields:
+        The requests, ordered by offset.
+    """
+    methods = {method.upper() for method in methods}
+    first = None
+
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(record, dict) or 'path' not in record:
+            continue
+        if record.get('method') not in methods:
+            continue
+
+        path = record['path']
+        if record.get('query'):
+            path = f"{path}?{record['query']}"
+
+        recorded = datetime.fromisoformat(record['time']).timestamp()
+        first = recorded if first is None else first
+        yield Request(
+            offset=(recorded - first) / speed,
+            operation=record.get('route') or record['path'],
+            method=record['method'],
+            path=path,
+            kwargs={'headers': headers or {}},
+        )
+
+
+async def bench(
+    url: str,
+    rps: float,
+    duration: float,
+    mix: str,
+    users: int,
+    max_in_flight: int,
+    timeout: float,
+    seed: int | None = None,
+    poisson: bool = False,
+    replay: Iterable[str] | None = None,
+    speed: float = 1,
+    headers: dict[str, str] | None = None,
+) -> dict[str, Any]:
+    """
+    Run a load test against the API and report the results.
+
+    Either generate an operation mix at `rps` requests per second for `duration`
+    seconds, or replay the access log lines in `replay`.
+
+    Returns:
+        The report, see `report`.
+    """
+    if httpx is None:
+        raise RuntimeError("The bench command requires httpx, install the bench extra")
+
+    limits = httpx.Limits(max_connections=max_in_flight)
+    async with httpx.AsyncClient(
+        base_url=url, timeout=timeout, limits=limits
+    ) as client:
+        if replay is not None:
+            requests = read_access_log(replay, speed=speed, headers=headers)
+        else:
+            weights = parse_mix(mix)
+            run_id = uuid.uuid4().hex[:8]
+            bench_users = []
+            if weights.get('login') or weights.get('me'):
+                bench_users = await create_users(client, users, run_id)
+            requests = generate_mix(
+                weights, bench_users, rps, duration, run_id, seed, poisson
+            )
+
+        results, elapsed = await run_open_loop(client, requests, max_in_flight)
+
+    return report(results, elapsed)
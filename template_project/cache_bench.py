@@ -0,0 +1,213 @@
+import asyncio
+import random
+import time
+import uuid
+from typing import Any
+
+from redis.asyncio import Redis
+
+from template_project.api.cache import create_redis_client
+from template_project.api.coders import COMPRESSORS, SERIALIZERS, get_coder
+from template_project.bench import Result, summarize
+from template_project.config import CacheSettings
+from template_project.models.validation import UserPublic
+
+
+async def _close(client: Any) -> None:
+    if isinstance(client, Redis):
+        await client.close(close_connection_pool=True)
+    else:
+        await client.close()
+
+
+async def _run_pool(
+    config: CacheSettings,
+    keys: list[str],
+    concurrency: int,
+    batch_size: int,
+    duration: float,
+) -> dict[str, Any]:
+    client = create_redis_client(config)
+    results: list[Result] = []
+    try:
+        # Open the connections before measuring
+        await asyncio.gather(*(client.ping() for _ in range(config.MAX_CONNECTIONS)))
+
+        async def caller(deadline: float) -> None:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                try:
+                    await client.mget(random.sample(keys, batch_size))
+                except Exception as exc:
+                    results.append(
+                        Result(
+                            'mget',
+                            time.perf_counter() - started,
+                            error=type(exc).__name__,
+                        )
+                    )
+                else:
+                    results.append(Result('mget', time.perf_counter() - started))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(caller(started + duration) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await _close(client)
+
+    return summarize(results, elapsed)
+
+
+async def bench_redis_pool(
+    pool_sizes: list[int],
+    concurrency: int,
+    duration: float,
+    keys: int = 1000,
+    batch_size: int = 10,
+    value_size: int = 512,
+    config: CacheSettings | None = None,
+) -> dict[str, Any]:
+    """
+    Measure the cache throughput and latency for each connection pool size.
+
+    `concurrency` callers repeatedly read `batch_size` random keys with `MGET`, as the
+    entity cache does, through a client created with `create_redis_client`. Latencies
+    include the time spent waiting for a free connection, so a pool smaller than the
+    number of callers shows up as queueing and, past `CACHE_POOL_TIMEOUT`, as errors.
+
+    Args:
+        pool_sizes: The values of `CACHE_MAX_CONNECTIONS` to compare.
+        concurrency: The number of concurrent callers.
+        duration: The duration of each run in seconds.
+        keys: The number of keys written before the runs and read during them.
+        batch_size: The number of keys read per call.
+        value_size: The size of each value in bytes.
+        config: The cache configuration, loaded from the environment by default.
+
+    Returns:
+        The settings of the runs and, by pool size, the call count, throughput, errors
+        and latency percentiles in milliseconds.
+    """
+    config = config or CacheSettings()
+    if config.REDIS_MODE != 'standalone':
+        raise ValueError("The Redis pool benchmark requires a standalone Redis")
+    if not config.CONNECTION_STRING:
+        raise ValueError("CACHE_CONNECTION_STRING is not set")
+
+    run_id = uuid.uuid4().hex
+    names = [f'{config.PREFIX}:bench:{run_id}:{index}' for index in range(keys)]
+    value = random.randbytes(value_size)
+
+    client = create_redis_client(config)
+    try:
+        for start in range(0, keys, 500):
+            await client.mset({name: value for name in names[start : start + 500]})
+
+        runs = {}
+        for size in pool_sizes:
+            runs[str(size)] = await _run_pool(
+                config.model_copy(update={'MAX_CONNECTIONS': size}),
+                names,
+                concurrency,
+                min(batch_size, keys),
+                duration,
+            )
+    finally:
+        for start in range(0, keys, 500):
+            await client.unlink(*names[start : start + 500])
+        await _close(client)
+
+    return {
+        'concurrency': concurrency,
+        'duration_s': duration,
+        'batch_size': batch_size,
+        'value_size': value_size,
+        'pool_sizes': runs,
+    }
+
+
+def sample_users(count: int, seed: int = 0) -> list[UserPublic]:
+    """Generate users shaped like the responses of the account endpoints."""
+    generator = random.Random(seed)
+    first_names = ['Ada', 'Alan', 'Grace', 'Edsger', 'Barbara', 'Donald', 'Frances']
+    last_names = ['Lovelace', 'Turing', 'Hopper', 'Dijkstra', 'Liskov', 'Knuth']
+    users = []
+    for _ in range(count):
+        first_name = generator.choice(first_names)
+        last_name = generator.choice(last_names)
+        number = generator.randrange(10**6)
+        users.append(
+            UserPublic(
+                id=uuid.UUID(int=generator.getrandbits(128), version=4),
+                email=f'{first_name}.{last_name}.{number}@example.com'.lower(),
+                first_name=first_name,
+                last_name=last_name,
+            )
+        )
+    return users
+
+
+def _timeit(function: Any, argument: Any, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function(argument)
+    return (time.perf_counter() - started) / iterations
+
+
+def bench_coders(
+    sizes: list[int], iterations: int, threshold: int = 1024
+) -> dict[str, Any]:
+    """
+    Measure the stored size and the encode and decode time of each cache coder.
+
+    Every serializer and compression combination with its optional dependency
+    installed encodes lists of `sizes` users, as returned by the list endpoints.
+
+    Args:
+        sizes: The number of users per cached entry.
+        iterations: The number of encodes and decodes timed per entry.
+        threshold: The compression threshold in bytes.
+
+    Returns:
+        By entry size and coder, the bytes stored, the size relative to the default
+        `JsonCoder`, and the mean encode and decode time in microseconds. Coders
+        missing a dependency are listed as unavailable.
+    """
+    coders = {}
+    unavailable = []
+    for serializer, (_, serializer_module, _, _) in SERIALIZERS.items():
+        for compression, (_, compression_module, _, _) in COMPRESSORS.items():
+            name = f'{serializer}+{compression}'
+            if (serializer != 'json' and serializer_module is None) or (
+                compression != 'none' and compression_module is None
+            ):
+                unavailable.append(name)
+                continue
+            coders[name] = get_coder(
+                CacheSettings(
+                    CODER=serializer,
+                    COMPRESSION=compression,
+                    COMPRESSION_THRESHOLD=threshold,
+                )
+            )
+
+    entries = {}
+    for size in sizes:
+        users = sample_users(size)
+        baseline = len(coders['json+none'].encode(users))
+        entries[str(size)] = results = {}
+        for name, coder in coders.items():
+            encoded = coder.encode(users)
+            results[name] = {
+                'bytes': len(encoded),
+                'ratio': round(len(encoded) / baseline, 3),
+                'encode_us': round(_timeit(coder.encode, users, iterations) * 1e6, 1),
+                'decode_us': round(_timeit(coder.decode, encoded, iterations) * 1e6, 1),
+            }
+
+    return {
+        'iterations': iterations,
+        'compression_threshold': threshold,
+        'entries': entries,
+        'unavailable': unavailable,
+    }
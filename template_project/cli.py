@@ -1,3 +1,5 @@
+import asyncio
+import json
 import logging
 
 import click
@@ -20,5 +22,201 @@ def example():
     print("Example command")
 
 
+@cli.command()
+def backfill_directory():
+    """Add the users of the main database missing from the global email index."""
+    from template_project.db.controllers.accounts import backfill_directory
+    from template_project.db.sharding import get_shard_router
+
+    count = backfill_directory(get_shard_router())
+    click.echo(f"Added {count} users to the email index")
+
+
+@cli.command()
+@click.option(
+    "--concurrency",
+    type=int,
+    default=None,
+    help="The number of jobs to run at a time [default: WORKER_CONCURRENCY]",
+)
+def worker(concurrency):
+    """Run background jobs from the job queue."""
+    from template_project.config import LoggingSettings, WorkerSettings
+    from template_project.logs import configure_logging
+    from template_project.worker import Worker
+
+    configure_logging(LoggingSettings())
+    asyncio.run(Worker(WorkerSettings(), concurrency=concurrency).run())
+
+
+@cli.command()
+@click.option("--url", default="http://localhost:8000", show_default=True)
+@click.option(
+    "--rps", default=50.0, help="Target requests per second", show_default=True
+)
+@click.option("--duration", default=30.0, help="Duration in seconds", show_default=True)
+@click.option(
+    "--mix",
+    default="signup=1,login=2,me=7",
+    help="Relative weights of the signup, login and me operations",
+    show_default=True,
+)
+@click.option(
+    "--users", default=50, help="Users created for login and me", show_default=True
+)
+@click.option(
+    "--max-in-flight",
+    default=1000,
+    help="Concurrent requests after which new requests are dropped",
+    show_default=True,
+)
+@click.option("--timeout", default=10.0, help="Request timeout", show_default=True)
+@click.option("--seed", type=int, default=None, help="Seed for a repeatable mix")
+@click.option("--poisson", is_flag=True, help="Poisson arrivals instead of constant")
+@click.option(
+    "--replay",
+    type=click.File(),
+    default=None,
+    help="NDJSON access log to replay instead of the mix",
+)
+@click.option("--speed", default=1.0, help="Replay speed factor", show_default=True)
+@click.option(
+    "--header", multiple=True, help="Header added to replayed requests, 'Name: value'"
+)
+@click.option(
+    "--output", type=click.File('w'), default='-', help="Report file [default: stdout]"
+)
+def bench(
+    url,
+    rps,
+    duration,
+    mix,
+    users,
+    max_in_flight,
+    timeout,
+    seed,
+    poisson,
+    replay,
+    speed,
+    header,
+    output,
+):
+    """Load test the API at a target rate, or replay recorded access logs."""
+    from template_project.bench import bench as run_bench
+
+    headers = dict(
+        (name.strip(), value.strip())
+        for name, _, value in (item.partition(':') for item in header)
+    )
+    try:
+        result = asyncio.run(
+            run_bench(
+                url=url,
+                rps=rps,
+                duration=duration,
+                mix=mix,
+                users=users,
+                max_in_flight=max_in_flight,
+                timeout=timeout,
+                seed=seed,
+                poisson=poisson,
+                replay=replay,
+                speed=speed,
+                headers=headers,
+            )
+        )
+    except (ValueError, RuntimeError) as exc:
+        raise click.ClickException(str(exc))
+
+    json.dump(result, output, indent=2)
+    output.write('\n')
+
+
+@cli.command()
+@click.option(
+    "--pool-sizes",
+    default="1,2,5,10,25,50",
+    help="Comma separated values of CACHE_MAX_CONNECTIONS to compare",
+    show_default=True,
+)
+@click.option(
+    "--concurrency", default=100, help="Concurrent callers", show_default=True
+)
+@click.option(
+    "--duration", default=10.0, help="Duration of each run", show_default=True
+)
+@click.option(
+    "--keys", default=1000, help="Keys read by the callers", show_default=True
+)
+@click.option("--batch-size", default=10, help="Keys read per call", show_default=True)
+@click.option(
+    "--value-size", default=512, help="Size of each value in bytes", show_default=True
+)
+@click.option(
+    "--output", type=click.File('w'), default='-', help="Report file [default: stdout]"
+)
+def bench_redis(
+    pool_sizes, concurrency, duration, keys, batch_size, value_size, output
+):
+    """Compare Redis connection pool sizes under concurrency, see CACHE_* settings."""
+    from redis.exceptions import RedisError
+
+    from template_project.cache_bench import bench_redis_pool
+
+    try:
+        sizes = [int(size) for size in pool_sizes.split(',')]
+        result = asyncio.run(
+            bench_redis_pool(
+                pool_sizes=sizes,
+                concurrency=concurrency,
+                duration=duration,
+                keys=keys,
+                batch_size=batch_size,
+                value_size=value_size,
+            )
+        )
+    except (ValueError, RedisError) as exc:
+        raise click.ClickException(str(exc))
+
+    json.dump(result, output, indent=2)
+    output.write('\n')
+
+
+@cli.command()
+@click.option(
+    "--sizes",
+    default="1,20,100,1000",
+    help="Comma separated numbers of users per cached entry",
+    show_default=True,
+)
+@click.option(
+    "--iterations", default=200, help="Timed encodes per entry", show_default=True
+)
+@click.option(
+    "--threshold",
+    default=1024,
+    help="Compression threshold in bytes",
+    show_default=True,
+)
+@click.option(
+    "--output", type=click.File('w'), default='-', help="Report file [default: stdout]"
+)
+def bench_coders(sizes, iterations, threshold, output):
+    """Compare the size and speed of the cache coders and compressions."""
+    from template_project.cache_bench import bench_coders as run_bench_coders
+
+    try:
+        result = run_bench_coders(
+            sizes=[int(size) for size in sizes.split(',')],
+            iterations=iterations,
+            threshold=threshold,
+        )
+    except ValueError as exc:
+        raise click.ClickException(str(exc))
+
+    json.dump(result, output, indent=2)
+    output.write('\n')
+
+
 if __name__ == "__main__":
     cli()
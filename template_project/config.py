@@ -15,6 +15,15 @@ class DatabaseSettings(BaseSettings):
     POOL_PRE_PING: bool = False
     POOL_USE_LIFO: bool = False
     ECHO: bool = False
+    POOL_PREWARM: bool = True
+    SHARDS: list[str] = []
+    STATEMENT_TIMEOUT: str | None = '30s'
+    LOCK_TIMEOUT: str | None = '10s'
+    IDLE_IN_TRANSACTION_TIMEOUT: str | None = '60s'
+    MIGRATION_LOCK_TIMEOUT: str = '5s'
+    MIGRATION_STATEMENT_TIMEOUT: str = '15min'
+    MIGRATION_LOCK_RETRIES: int = 5
+    MIGRATION_LOCK_RETRY_DELAY: float = 1
 
 
 class SecretDatabaseSettings(SecretBaseSettings):
@@ -30,6 +39,18 @@ class APISettings(BaseSettings):
     ORIGINS: list[str]
     ORIGIN_REGEX: str | None = None
     DOCS_ENABLED: bool = True
+    BATCH_MAX_SIZE: int = 100
+    SEARCH_MAX_RESULTS: int = 50
+    SEARCH_STATEMENT_TIMEOUT: str = '2s'
+    BATCH_STATEMENT_TIMEOUT: str = '1s'
+    LAST_LOGIN_FLUSH_INTERVAL: float = 5
+    LAST_LOGIN_FLUSH_SIZE: int = 500
+    LAST_LOGIN_MAX_PENDING: int = 100000
+    DRAIN_TIMEOUT: float = 30
+    SHUTDOWN_DELAY: float = 5
+    HEALTH_CHECK_INTERVAL: float = 5
+    HEALTH_CHECK_TIMEOUT: float = 2
+    PROFILE_MAX_SECONDS: float = 60
 
 
 class SecretAPISettings(SecretBaseSettings):
@@ -44,7 +65,55 @@ class CacheSettings(BaseSettings):
     CONNECTION_STRING: str | None = None
     PREFIX: str = 'jobs-api'
     EXPIRATION: int | None = None
+    ENTITY_EXPIRATION: int = 300
+    INVALIDATION_DELAY: float = 1
     ENABLED: bool = False
+    CODER: str = 'json'
+    COMPRESSION: str = 'none'
+    COMPRESSION_THRESHOLD: int = 1024
+    WARMUP_ENABLED: bool = False
+    WARMUP_KEYS: int = 1000
+    WARMUP_BATCH_SIZE: int = 100
+    WARMUP_CONCURRENCY: int = 4
+    WARMUP_TIMEOUT: float = 10
+    SNAPSHOT_PATH: str | None = None
+    REDIS_MODE: str = 'standalone'
+    SENTINEL_HOSTS: list[str] = []
+    SENTINEL_SERVICE_NAME: str | None = None
+    MAX_CONNECTIONS: int = 50
+    POOL_TIMEOUT: float | None = 5
+    SOCKET_TIMEOUT: float | None = 1
+    SOCKET_CONNECT_TIMEOUT: float | None = 1
+    HEALTH_CHECK_INTERVAL: int = 30
+    RETRY_ATTEMPTS: int = 3
+    RETRY_BACKOFF_BASE: float = 0.01
+    RETRY_BACKOFF_CAP: float = 0.5
+    OPERATION_TIMEOUT: float = 0.2
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30
+
+
+class WorkerSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix='WORKER_')
+
+    CONCURRENCY: int = 4
+    TASK_MODULES: list[str] = []
+    POLL_INTERVAL: float = 30
+    STALE_TIMEOUT: int = 600
+    HEARTBEAT_INTERVAL: float = 60
+    RETRY_BACKOFF_BASE: float = 5
+    RETRY_BACKOFF_MAX: float = 3600
+
+
+class LoggingSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix='LOG_')
+
+    LEVEL: str = 'INFO'
+    FORMAT: str = 'json'
+    QUEUE_SIZE: int = 10000
+    ACCESS_LOG: bool = True
+    ACCESS_SAMPLE_RATE: float = 1
+    ACCESS_SLOW_THRESHOLD: float = 1
 
 
 class SecretTokenSettings(SecretBaseSettings):
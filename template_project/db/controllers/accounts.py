@@ -1,22 +1,104 @@
+import heapq
 import uuid
+from collections import defaultdict
+from datetime import datetime
+from itertools import islice
+from typing import Any, Sequence
 
-from sqlmodel import Session, select
+from sqlalchemy import literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, col, delete, func, or_, select, text
 
-from template_project.models.database import User
+from template_project.db.factories import SessionPolicy
+from template_project.db.sharding import DIRECTORY_SHARD, ShardRouter
+from template_project.models.database import User, UserDirectory
 from template_project.models.validation import UserCreate, UserUpdate
 from template_project.security import get_password_hash, verify_password
 
 
 def get_user_by_email(session: Session, email: str) -> User | None:
-    """Retrieve a user by email address."""
-    statement = select(User).where(User.email == email)
+    """Retrieve a user by email address, regardless of case."""
+    statement = select(User).where(func.lower(User.email) == email.lower())
     user = session.exec(statement).first()
     return user
 
 
-def get_user_by_id(session: Session, user_id: uuid.UUID) -> User | None:
-    """Retrieve a user by ID."""
-    return session.get(User, user_id)
+def get_user_by_id(
+    session: Session, user_id: uuid.UUID, for_update: bool = False
+) -> User | None:
+    """Retrieve a user by ID, optionally locking the row until the transaction ends."""
+    return session.get(User, user_id, with_for_update=for_update)
+
+
+def get_users(
+    session: Session,
+    user_ids: Sequence[uuid.UUID] = (),
+    emails: Sequence[str] = (),
+) -> list[User]:
+    """
+    Retrieve multiple users by ID or email address using a single query.
+
+    Emails are matched regardless of case.
+
+    Args:
+        session: The database session for executing the query.
+        user_ids (optional): The unique identifiers of the users to retrieve.
+        emails (optional): The email addresses of the users to retrieve.
+
+    Returns:
+        The users matching any of the given IDs or emails, in no particular order.
+    """
+    if not user_ids and not emails:
+        return []
+
+    statement = select(User).where(
+        or_(
+            User.id.in_(user_ids),  # type: ignore
+            func.lower(User.email).in_([email.lower() for email in emails]),
+        )
+    )
+    return list(session.exec(statement).all())
+
+
+def search_users(session: Session, query: str, limit: int = 20) -> list[User]:
+    """
+    Search users by prefix or fuzzy match on their email address and full name.
+
+    Matching and ranking use the `pg_trgm` extension, backed by GIN indexes on
+    `lower(email)` and `lower(first_name || ' ' || last_name)`. Prefix matches are
+    ranked first, followed by the remaining matches in order of trigram similarity.
+
+    Args:
+        session: The database session for executing the query.
+        query: The search term.
+        limit (optional): The maximum number of users to return. Defaults to 20.
+
+    Returns:
+        The matching users, best match first.
+    """
+    statement = _search_statement(query, limit)
+    return [user for user, _, _ in session.exec(statement).all()]
+
+
+def _search_statement(query: str, limit: int) -> Any:
+    term = query.strip().lower()
+    pattern = term.replace('/', '//').replace('%', '/%').replace('_', '/_') + '%'
+
+    email = func.lower(User.email)
+    name = func.lower(User.first_name + literal_column("' '") + User.last_name)
+
+    is_prefix = or_(email.like(pattern, escape='/'), name.like(pattern, escape='/'))
+    similarity = func.greatest(
+        func.similarity(email, term), func.similarity(name, term)
+    )
+
+    return (
+        select(User, is_prefix, similarity)
+        .where(or_(is_prefix, email.bool_op('%')(term), name.bool_op('%')(term)))
+        .order_by(is_prefix.desc(), similarity.desc())
+        .limit(limit)
+    )
 
 
 def authenticate_user(session: Session, email: str, password: str) -> User | None:
@@ -98,3 +180,285 @@ def update_user(
     session.refresh(db_user)
 
     return db_user
+
+
+def update_last_logins(session: Session, logins: dict[uuid.UUID, datetime]) -> int:
+    """
+    Record the last login time of multiple users using a single statement.
+
+    The rows are updated with `UPDATE ... FROM (VALUES ...)`, and a login time never
+    replaces a later one, so batches written out of order are harmless. The
+    `updated_at` field is left untouched.
+
+    Args:
+        session: The database session for executing the operation.
+        logins: The last login time by user ID.
+
+    Returns:
+        The number of updated users.
+    """
+    if not logins:
+        return 0
+
+    rows = []
+    params: dict[str, Any] = {}
+    for i, (user_id, logged_in_at) in enumerate(logins.items()):
+        rows.append(f"(CAST(:id_{i} AS uuid), CAST(:at_{i} AS timestamp))")
+        params[f'id_{i}'] = str(user_id)
+        params[f'at_{i}'] = logged_in_at
+
+    statement = text(f"""
+        UPDATE users
+        SET last_login_at = GREATEST(users.last_login_at, v.last_login_at)
+        FROM (VALUES {', '.join(rows)}) AS v (id, last_login_at)
+        WHERE users.id = v.id
+        """)
+    result = session.exec(statement, params=params)  # type: ignore
+    return result.rowcount
+
+
+def get_directory_entries(
+    router: ShardRouter, emails: Sequence[str]
+) -> dict[str, UserDirectory]:
+    """
+    Resolve email addresses to users and their shard, using the global email index.
+
+    Emails missing from the index are looked up in the users of the main database,
+    which may have been created without an index entry, by a worker predating the
+    index or while unsharded. The missing entries are added.
+
+    Args:
+        router: The shard router.
+        emails: The email addresses to resolve, regardless of case.
+
+    Returns:
+        The index entries by lowercased email address, for the emails found.
+    """
+    if not emails:
+        return {}
+
+    lowered = {email.lower() for email in emails}
+    statement = select(UserDirectory).where(col(UserDirectory.email).in_(lowered))
+    with router.session(DIRECTORY_SHARD) as session:
+        entries = {entry.email: entry for entry in session.exec(statement).all()}
+
+        missing = lowered - entries.keys()
+        if missing:
+            repaired = [
+                UserDirectory(
+                    email=user.email.lower(), user_id=user.id, shard=DIRECTORY_SHARD
+                )
+                for user in get_users(session=session, emails=[*missing])
+            ]
+            if repaired:
+                session.exec(
+                    insert(UserDirectory)  # type: ignore
+                    .values([entry.model_dump() for entry in repaired])
+                    .on_conflict_do_nothing()
+                )
+            entries.update((entry.email, entry) for entry in repaired)
+
+    return entries
+
+
+def backfill_directory(router: ShardRouter) -> int:
+    """
+    Add the users of the main database missing from the global email index.
+
+    Returns:
+        The number of entries added.
+    """
+    with router.session(DIRECTORY_SHARD) as session:
+        result = session.exec(
+            text(  # type: ignore
+                "INSERT INTO user_directory (email, user_id, shard) "
+                "SELECT lower(email), id, :shard FROM users ON CONFLICT DO NOTHING"
+            ),
+            params={'shard': DIRECTORY_SHARD},
+        )
+        return result.rowcount
+
+
+def get_sharded_user_by_email(
+    router: ShardRouter, email: str, policy: SessionPolicy | None = None
+) -> User | None:
+    """
+    Retrieve a user by email address from its shard, regardless of case.
+
+    The `policy` applies to the session reading the user. The email index may be
+    repaired, see `get_directory_entries`, so it is read with the default policy.
+    """
+    if not router.sharded:
+        with router.session(DIRECTORY_SHARD, policy) as session:
+            return get_user_by_email(session=session, email=email)
+
+    entry = get_directory_entries(router, [email]).get(email.lower())
+    if not entry:
+        return None
+
+    with router.session(entry.shard, policy) as session:
+        return session.get(User, entry.user_id)
+
+
+def get_sharded_users(
+    router: ShardRouter,
+    user_ids: Sequence[uuid.UUID] = (),
+    emails: Sequence[str] = (),
+    policy: SessionPolicy | None = None,
+) -> list[User]:
+    """
+    Retrieve multiple users by ID or email address from their shards.
+
+    Emails are resolved through the global email index, and each shard holding any of
+    the users is queried once, concurrently.
+
+    Args:
+        router: The shard router.
+        user_ids (optional): The unique identifiers of the users to retrieve.
+        emails (optional): The email addresses of the users to retrieve.
+        policy (optional): The transaction policy of the sessions reading the users.
+            The email index may be repaired, so it is read with the default policy.
+
+    Returns:
+        The users matching any of the given IDs or emails, in no particular order.
+    """
+    if not router.sharded:
+        with router.session(DIRECTORY_SHARD, policy) as session:
+            return get_users(session=session, user_ids=user_ids, emails=emails)
+
+    by_shard: dict[int, set[uuid.UUID]] = defaultdict(set)
+    for user_id in user_ids:
+        by_shard[router.shard_for_user(user_id)].add(user_id)
+    for entry in get_directory_entries(router, emails).values():
+        by_shard[entry.shard].add(entry.user_id)
+
+    if not by_shard:
+        return []
+
+    results = router.fan_out(
+        lambda session, shard: get_users(session=session, user_ids=[*by_shard[shard]]),
+        shards=by_shard,
+        policy=policy,
+    )
+    return [user for users in results.values() for user in users]
+
+
+def search_sharded_users(
+    router: ShardRouter,
+    query: str,
+    limit: int = 20,
+    policy: SessionPolicy | None = None,
+) -> list[User]:
+    """
+    Search users on every shard concurrently, see `search_users`.
+
+    Each shard returns its best `limit` matches, which are merged by rank.
+
+    Args:
+        router: The shard router.
+        query: The search term.
+        limit (optional): The maximum number of users to return. Defaults to 20.
+        policy (optional): The transaction policy of the sessions.
+
+    Returns:
+        The matching users, best match first.
+    """
+    statement = _search_statement(query, limit)
+    results = router.fan_out(
+        lambda session, _: session.exec(statement).all(), policy=policy
+    )
+
+    ranked = heapq.merge(
+        *results.values(), key=lambda row: (not row[1], -row[2])  # type: ignore
+    )
+    return [user for user, _, _ in islice(ranked, limit)]
+
+
+def create_sharded_user(router: ShardRouter, user_in: UserCreate) -> User | None:
+    """
+    Create a new user on its shard, and add it to the global email index.
+
+    The index entry is committed first, so that the email address is reserved across
+    shards, and removed again if the user cannot be created. When the user belongs to
+    the main database, both are written in the same transaction. Without shards, the
+    index is not maintained and the user is created with a single statement, see
+    `backfill_directory`.
+
+    Args:
+        router: The shard router.
+        user_in: The data for creating the new user, containing the user's email, first name,
+            last name and password.
+
+    Returns:
+        The newly created user object, or None if the email address is already in use.
+    """
+    if not router.sharded:
+        try:
+            with router.session(DIRECTORY_SHARD) as session:
+                return create_user(session=session, user_in=user_in)
+        except IntegrityError:
+            return None
+
+    user = User.model_validate(
+        user_in, update={"hashed_password": get_password_hash(user_in.password)}
+    )
+    shard = router.shard_for_user(user.id)
+    entry = UserDirectory(email=user.email.lower(), user_id=user.id, shard=shard)
+
+    try:
+        with router.session(DIRECTORY_SHARD) as session:
+            session.add(entry)
+            if shard == DIRECTORY_SHARD:
+                session.add(user)
+                session.flush()
+                session.refresh(user)
+                return user
+    except IntegrityError:
+        return None
+
+    try:
+        with router.session(shard) as session:
+            session.add(user)
+            session.flush()
+            session.refresh(user)
+    except Exception:
+        with router.session(DIRECTORY_SHARD) as session:
+            session.exec(delete(UserDirectory).where(col(UserDirectory.user_id) == user.id))  # type: ignore
+        raise
+
+    return user
+
+
+def authenticate_sharded_user(
+    router: ShardRouter,
+    email: str,
+    password: str,
+    policy: SessionPolicy | None = None,
+) -> User | None:
+    """Authenticate a user on its shard, see `authenticate_user`."""
+    db_user = get_sharded_user_by_email(router=router, email=email, policy=policy)
+    if not db_user:
+        return None
+    if not verify_password(password, db_user.hashed_password):
+        return None
+    return db_user
+
+
+def update_sharded_last_logins(
+    router: ShardRouter, logins: dict[uuid.UUID, datetime]
+) -> int:
+    """Record the last login time of users on their shards, see `update_last_logins`."""
+    by_shard: dict[int, dict[uuid.UUID, datetime]] = defaultdict(dict)
+    for user_id, logged_in_at in logins.items():
+        by_shard[router.shard_for_user(user_id)][user_id] = logged_in_at
+
+    if not by_shard:
+        return 0
+
+    results = router.fan_out(
+        lambda session, shard: update_last_logins(
+            session=session, logins=by_shard[shard]
+        ),
+        shards=by_shard,
+    )
+    return sum(results.values())
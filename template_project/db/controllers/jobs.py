@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import case
+from sqlmodel import Session, col, func, select, text, update
+
+from template_project.models.database import Job
+
+# Channel used to wake up idle workers when a job is enqueued
+JOBS_CHANNEL = 'jobs'
+
+
+def enqueue_job(
+    session: Session,
+    name: str,
+    payload: dict[str, Any] | None = None,
+    priority: int = 0,
+    run_at: datetime | None = None,
+    max_attempts: int = 5,
+) -> Job:
+    """
+    Add a job to the queue.
+
+    The job becomes visible to workers when the session is committed, at which point
+    idle workers are woken up through `NOTIFY`.
+
+    Args:
+        session: The database session for executing the operation.
+        name: The name of the registered task to run.
+        payload (optional): The keyword arguments of the task, which must be JSON
+            serializable.
+        priority (optional): Jobs with a higher priority are claimed first. Defaults to 0.
+        run_at (optional): The earliest time the job may run. Defaults to now.
+        max_attempts (optional): The number of attempts before the job is marked as
+            failed. Defaults to 5.
+
+    Returns:
+        The newly created job object.
+    """
+    job = Job(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+    )
+    if run_at:
+        job.run_at = run_at
+
+    session.add(job)
+    session.flush()
+    session.exec(  # type: ignore
+        text("SELECT pg_notify(:channel, :name)"),
+        params={'channel': JOBS_CHANNEL, 'name': name},
+    )
+
+    return job
+
+
+def claim_jobs(session: Session, limit: int) -> list[Job]:
+    """
+    Claim queued jobs that are due, for execution by the calling worker.
+
+    Jobs are selected by priority and then by `run_at`, using `FOR UPDATE SKIP LOCKED`
+    so concurrent workers never wait on, or claim, the same jobs.
+
+    Args:
+        session: The database session for executing the operation.
+        limit: The maximum number of jobs to claim.
+
+    Returns:
+        The claimed jobs, marked as running.
+    """
+    statement = (
+        select(Job)
+        .where(Job.status == 'queued', Job.run_at <= func.now())
+        .order_by(col(Job.priority).desc(), col(Job.run_at))
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    jobs = list(session.exec(statement).all())
+    if not jobs:
+        return []
+
+    session.exec(  # type: ignore
+        update(Job)
+        .where(col(Job.id).in_([job.id for job in jobs]))
+        .values(status='running', attempts=Job.attempts + 1, locked_at=func.now())
+    )
+    for job in jobs:
+        session.refresh(job)
+
+    return jobs
+
+
+def complete_job(session: Session, job_id: int) -> None:
+    """Mark a job as done."""
+    session.exec(  # type: ignore
+        update(Job).where(col(Job.id) == job_id).values(status='done', last_error=None)
+    )
+
+
+def fail_job(session: Session, job: Job, error: str, retry_in: timedelta) -> None:
+    """
+    Record a failed attempt of a job.
+
+    The job is queued again to run after `retry_in`, or marked as failed once it has
+    reached its maximum number of attempts.
+
+    Args:
+        session: The database session for executing the operation.
+        job: The failed job.
+        error: The error of the failed attempt.
+        retry_in: The delay before the job may run again.
+    """
+    values: dict[str, Any] = {'last_error': error}
+    if job.attempts >= job.max_attempts:
+        values['status'] = 'failed'
+    else:
+        values['status'] = 'queued'
+        values['run_at'] = func.now() + retry_in
+
+    session.exec(update(Job).where(col(Job.id) == job.id).values(**values))  # type: ignore
+
+
+def heartbeat_jobs(session: Session, job_ids: list[int]) -> None:
+    """Record that running jobs are still being worked on, see `requeue_stale_jobs`."""
+    session.exec(  # type: ignore
+        update(Job)
+        .where(col(Job.id).in_(job_ids), Job.status == 'running')
+        .values(locked_at=func.now())
+    )
+
+
+def requeue_stale_jobs(session: Session, timeout: timedelta) -> int:
+    """
+    Recover the jobs left running by workers that stopped without finishing them.
+
+    Workers record a heartbeat of their running jobs, so a job without a heartbeat for
+    `timeout` has been abandoned. It is queued again, or marked as failed once it has
+    reached its maximum number of attempts, so a job crashing its worker does not run
+    forever.
+
+    Args:
+        session: The database session for executing the operation.
+        timeout: The time without heartbeat after which a running job is considered
+            abandoned.
+
+    Returns:
+        The number of jobs recovered.
+    """
+    exhausted = Job.attempts >= Job.max_attempts
+    result = session.exec(  # type: ignore
+        update(Job)
+        .where(Job.status == 'running', Job.locked_at < func.now() - timeout)
+        .values(
+            status=case((exhausted, 'failed'), else_='queued'),
+            last_error=case(
+                (exhausted, 'Abandoned by its worker'), else_=Job.last_error
+            ),
+        )
+    )
+    return result.rowcount
+
+
+def get_next_run_at(session: Session) -> datetime | None:
+    """Retrieve the earliest `run_at` of the queued jobs, if any."""
+    statement = select(func.min(Job.run_at)).where(Job.status == 'queued')
+    return session.exec(statement).first()
@@ -1,6 +1,9 @@
 from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any
 
-from sqlalchemy.engine import URL, Engine
+from sqlalchemy import event, text
+from sqlalchemy.engine import URL, Connection, Engine
 from sqlmodel import Session, create_engine
 
 from template_project.config import DatabaseSettings, SecretDatabaseSettings
@@ -11,7 +14,95 @@ secret = SecretDatabaseSettings()  # type: ignore
 engine = None
 
 
-def create_database_engine() -> Engine:
+@dataclass(frozen=True)
+class SessionPolicy:
+    """
+    Transaction policy of a database session.
+
+    Timeouts use the PostgreSQL format, e.g. `500ms` or `5s`, and `0` disables them.
+    Timeouts left unset keep the defaults of the connection, set from
+    `DatabaseSettings`. The connection is only checked out from the pool when the
+    session first queries the database, so a session that never queries costs
+    nothing, whatever its policy.
+
+    Attributes:
+        read_only: Whether the session is read-only, so any write fails. Transactions
+            start with `BEGIN READ ONLY`, without an extra round trip. With
+            `autocommit`, the driver sets `default_transaction_read_only` on the
+            connection instead, which costs a round trip at checkout and checkin.
+        autocommit: Whether each statement commits on its own instead of running in a
+            transaction, which saves the `BEGIN` and `COMMIT` round trips of
+            single-statement reads.
+        statement_timeout: The maximum duration of a statement.
+        lock_timeout: The maximum time a statement waits for a lock.
+        idle_in_transaction_timeout: The maximum time a transaction may stay idle
+            before the server terminates the connection. Ignored with `autocommit`.
+    """
+
+    read_only: bool = False
+    autocommit: bool = False
+    statement_timeout: str | None = None
+    lock_timeout: str | None = None
+    idle_in_transaction_timeout: str | None = None
+
+    def execution_options(self) -> dict[str, Any]:
+        """Return the connection execution options implementing the policy."""
+        options: dict[str, Any] = {}
+        if self.autocommit:
+            options['isolation_level'] = 'AUTOCOMMIT'
+        if self.read_only:
+            options['postgresql_readonly'] = True
+        return options
+
+    def timeouts(self) -> dict[str, str]:
+        """Return the PostgreSQL timeouts overridden by the policy."""
+        timeouts = {
+            'statement_timeout': self.statement_timeout,
+            'lock_timeout': self.lock_timeout,
+        }
+        if not self.autocommit:
+            timeouts['idle_in_transaction_session_timeout'] = (
+                self.idle_in_transaction_timeout
+            )
+        return {name: value for name, value in timeouts.items() if value is not None}
+
+
+# Read-only transactions, for endpoints that only query the database
+READ_ONLY = SessionPolicy(read_only=True)
+
+# Statements without a transaction, for endpoints running a single query
+AUTOCOMMIT = SessionPolicy(autocommit=True)
+
+
+def _connect_options() -> str:
+    # Server defaults of every connection, so a runaway query or an abandoned
+    # transaction cannot hold a pooled connection indefinitely
+    timeouts = {
+        'statement_timeout': config.STATEMENT_TIMEOUT,
+        'lock_timeout': config.LOCK_TIMEOUT,
+        'idle_in_transaction_session_timeout': config.IDLE_IN_TRANSACTION_TIMEOUT,
+    }
+    return ' '.join(
+        f'-c {name}={value}' for name, value in timeouts.items() if value is not None
+    )
+
+
+def _set_config(connection: Connection, settings: dict[str, str], local: bool) -> None:
+    # Every setting is applied in a single round trip
+    calls = ', '.join(
+        f'set_config(:name_{i}, :value_{i}, {str(local).lower()})'
+        for i in range(len(settings))
+    )
+    params = {}
+    for i, (name, value) in enumerate(settings.items()):
+        params[f'name_{i}'] = name
+        params[f'value_{i}'] = value
+    connection.execute(text(f'SELECT {calls}'), params)
+
+
+def create_database_engine(
+    hostname: str | None = None, port: int | None = None, database: str | None = None
+) -> Engine:
     """
     Create and configure a `SQLAlchemy` database engine for PostgreSQL.
 
@@ -19,6 +110,11 @@ def create_database_engine() -> Engine:
     options found in the environment. The environment configuration is loaded using the
     `SecretDatabaseSettings` and `DatabaseSettings` models.
 
+    Args:
+        hostname (optional): The database host. Defaults to `DatabaseSettings.HOSTNAME`.
+        port (optional): The database port. Defaults to `DatabaseSettings.PORT`.
+        database (optional): The database name. Defaults to `DatabaseSettings.DATABASE`.
+
     Returns:
         A configured `SQLAlchemy` engine for interacting with the PostgreSQL database.
     """
@@ -26,12 +122,15 @@ def create_database_engine() -> Engine:
         "postgresql",
         username=secret.USER,
         password=secret.PASSWORD,
-        host=config.HOSTNAME,
-        database=config.DATABASE,
-        port=config.PORT,
+        host=hostname or config.HOSTNAME,
+        database=database or config.DATABASE,
+        port=port or config.PORT,
     )
 
     connect_args = {}
+    options = _connect_options()
+    if options:
+        connect_args['options'] = options
 
     engine = create_engine(
         connection_string,
@@ -46,7 +145,23 @@ def create_database_engine() -> Engine:
     return engine
 
 
-def get_db_session():
+def get_engine() -> Engine:
+    """Return the engine shared across the application, creating it if necessary."""
+    global engine
+    if not engine:
+        engine = create_database_engine()
+    return engine
+
+
+def dispose_engine() -> None:
+    """Close every pooled connection of the shared engine, if it was created."""
+    global engine
+    if engine:
+        engine.dispose()
+        engine = None
+
+
+def get_db_session(engine: Engine | None = None, policy: SessionPolicy | None = None):
     """
     Provide a database session.
 
@@ -54,6 +169,12 @@ def get_db_session():
     database session and handle committing the session after use and roll back in case
     of any exceptions.
 
+    Args:
+        engine (optional): The engine of the session, e.g. of a shard. Defaults to the
+            engine shared across the application.
+        policy (optional): The transaction policy of the session, see `SessionPolicy`.
+            Defaults to read-write transactions with the timeouts of the connection.
+
     Yields:
         A `SQLModel` session object for interacting with the database.
 
@@ -61,11 +182,12 @@ def get_db_session():
         Any exception raised during the session operation, including but not limited to
         database connection errors, query execution errors, or transaction errors.
     """
-    global engine
-    if not engine:
-        engine = create_database_engine()
+    engine = engine or get_engine()
+    options = policy.execution_options() if policy else {}
+    session = Session(engine.execution_options(**options) if options else engine)
+    if policy and policy.timeouts():
+        _apply_timeouts(session, policy)
 
-    session = Session(engine)
     try:
         yield session
         session.commit()
@@ -76,8 +198,36 @@ def get_db_session():
         session.close()
 
 
+def _apply_timeouts(session: Session, policy: SessionPolicy) -> None:
+    timeouts = policy.timeouts()
+
+    @event.listens_for(session, 'after_begin')
+    def set_timeouts(session: Session, transaction, connection: Connection):
+        # Within a transaction, local settings end with it
+        _set_config(connection, timeouts, local=not policy.autocommit)
+        if policy.autocommit:
+            session.info['policy_connection'] = connection
+
+    if not policy.autocommit:
+        return
+
+    # Without a transaction, settings outlive the statements, so they are reset
+    # before the connection returns to the pool
+    @event.listens_for(session, 'after_commit')
+    @event.listens_for(session, 'after_rollback')
+    def reset_timeouts(session: Session):
+        connection = session.info.pop('policy_connection', None)
+        if connection is None:
+            return
+        try:
+            connection.exec_driver_sql('; '.join(f'RESET {name}' for name in timeouts))
+        except Exception:
+            # Never return a connection with the settings to the pool
+            connection.invalidate()
+
+
 @contextmanager
-def get_session_ctx():
+def get_session_ctx(engine: Engine | None = None, policy: SessionPolicy | None = None):
     """
     Context manager for obtaining a database session.
 
@@ -95,4 +245,4 @@ def get_session_ctx():
             # Perform database operations
         ```
     """
-    yield from get_db_session()
+    yield from get_db_session(engine, policy)
@@ -0,0 +1,255 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Sequence, TypeVar
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# SQLSTATE raised by PostgreSQL when `lock_timeout` expires
+LOCK_NOT_AVAILABLE = '55P03'
+
+
+def is_lock_timeout(exc: BaseException) -> bool:
+    """Check whether an exception was raised because `lock_timeout` expired."""
+    return getattr(getattr(exc, 'orig', None), 'pgcode', None) == LOCK_NOT_AVAILABLE
+
+
+def current_shard() -> int:
+    """Return the shard the running migration is applied to, the main database is 0."""
+    return op.get_context().opts.get('shard', 0)
+
+
+def set_timeouts(
+    connection: Connection,
+    lock_timeout: str | None = None,
+    statement_timeout: str | None = None,
+) -> None:
+    """
+    Set the `lock_timeout` and `statement_timeout` of a database session.
+
+    Args:
+        connection: The database connection.
+        lock_timeout (optional): The PostgreSQL `lock_timeout`, e.g. `5s`.
+        statement_timeout (optional): The PostgreSQL `statement_timeout`, e.g. `1min`.
+    """
+    for name, value in (
+        ('lock_timeout', lock_timeout),
+        ('statement_timeout', statement_timeout),
+    ):
+        if value is not None:
+            connection.execute(
+                sa.text("SELECT set_config(:name, :value, false)"),
+                {'name': name, 'value': value},
+            )
+
+
+@contextmanager
+def timeouts(lock_timeout: str | None = None, statement_timeout: str | None = None):
+    """
+    Context manager overriding the session timeouts of the current migration.
+
+    Usage:
+        ```python
+        with timeouts(statement_timeout='0'):
+            op.execute(...)
+        ```
+    """
+    bind = op.get_bind()
+    previous = bind.execute(
+        sa.text(
+            "SELECT current_setting('lock_timeout'), "
+            "current_setting('statement_timeout')"
+        )
+    ).one()
+
+    set_timeouts(bind, lock_timeout, statement_timeout)
+    try:
+        yield
+    finally:
+        set_timeouts(bind, *previous)
+
+
+def with_lock_retries(
+    operation: Callable[[], T], retries: int = 5, delay: float = 1
+) -> T:
+    """
+    Run an operation, retrying it with exponential backoff when `lock_timeout` expires.
+
+    A short `lock_timeout` makes a blocked DDL statement give up instead of queueing
+    every other query behind its pending lock. Retrying gives it another chance once
+    the conflicting transaction has finished.
+
+    Args:
+        operation: The operation to run. It must be safe to run again after failing.
+        retries (optional): The maximum number of retries. Defaults to 5.
+        delay (optional): The delay before the first retry in seconds. Defaults to 1.
+
+    Returns:
+        The result of the operation.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return operation()
+        except DBAPIError as exc:
+            if not is_lock_timeout(exc) or attempt == retries:
+                raise
+            logger.warning(
+                f"Lock timeout, retrying in {delay * 2**attempt:.1f}s "
+                f"({attempt + 1}/{retries})"
+            )
+            time.sleep(delay * 2**attempt)
+
+    raise AssertionError("unreachable")
+
+
+def _drop_invalid_index(index_name: str) -> None:
+    invalid = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {'name': index_name},
+        )
+        .first()
+    )
+    if invalid:
+        op.execute(sa.text(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"'))
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: Sequence[str | sa.TextClause],
+    statement_timeout: str = '0',
+    **kw: Any,
+) -> None:
+    """
+    Build an index without blocking writes to the table.
+
+    `CREATE INDEX CONCURRENTLY` cannot run inside a transaction, so the index is built
+    in an autocommit block. A previous failed build leaves an invalid index behind,
+    which is dropped first, so the operation can safely be retried.
+
+    Args:
+        index_name: The name of the index.
+        table_name: The name of the table.
+        columns: The columns or expressions of the index.
+        statement_timeout (optional): The `statement_timeout` of the build. Defaults
+            to no timeout.
+        **kw: Additional arguments for `op.create_index`, e.g. `unique=True`.
+    """
+    with op.get_context().autocommit_block(), timeouts(
+        statement_timeout=statement_timeout
+    ):
+        _drop_invalid_index(index_name)
+        op.create_index(
+            index_name,
+            table_name,
+            columns,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+            **kw,
+        )
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """Drop an index without blocking reads and writes to the table."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            index_name,
+            table_name=table_name,
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def batched_backfill(
+    table_name: str,
+    set_clause: str,
+    where_clause: str,
+    batch_size: int = 1000,
+    pause: float = 0.1,
+    key: str = 'id',
+    params: dict[str, Any] | None = None,
+) -> int:
+    """
+    Update the rows of a large table in small, separately committed batches.
+
+    Each batch updates at most `batch_size` rows, in key order, that still match
+    `where_clause`, and is committed on its own so row locks are only held briefly.
+    The `where_clause` must stop matching rows once they are updated, which makes the
+    backfill resumable: running it again only updates the remaining rows. Batches
+    blocked by `lock_timeout` are retried and the backfill sleeps `pause` seconds
+    between batches to limit the load on the database.
+
+    Args:
+        table_name: The name of the table.
+        set_clause: The SQL assignments of the update, e.g. `name = lower(name)`.
+        where_clause: The SQL condition matching rows still to update, e.g.
+            `name_lower IS NULL`.
+        batch_size (optional): The number of rows per batch. Defaults to 1000.
+        pause (optional): The pause between batches in seconds. Defaults to 0.1.
+        key (optional): The unique, ordered column used to page through the table.
+            Defaults to `id`.
+        params (optional): Bind parameters used in the clauses.
+
+    Returns:
+        The number of updated rows.
+
+    Usage:
+        ```python
+        def upgrade():
+            op.add_column('users', sa.Column('email_lower', sa.String()))
+            batched_backfill('users', 'email_lower = lower(email)', 'email_lower IS NULL')
+        ```
+    """
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        estimate = bind.execute(
+            sa.text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+            {'name': table_name},
+        ).scalar()
+
+        started = time.monotonic()
+        updated = 0
+        last_key = None
+
+        while True:
+            after = f"AND {key} > :last_key" if last_key is not None else ""
+            statement = sa.text(f"""
+                WITH batch AS (
+                    SELECT {key} FROM {table_name}
+                    WHERE ({where_clause}) {after}
+                    ORDER BY {key}
+                    LIMIT :batch_size
+                )
+                UPDATE {table_name} SET {set_clause}
+                FROM batch WHERE {table_name}.{key} = batch.{key}
+                RETURNING {table_name}.{key}
+                """)
+            values = {**(params or {}), 'batch_size': batch_size, 'last_key': last_key}
+
+            keys = with_lock_retries(
+                lambda: bind.execute(statement, values).scalars().all()
+            )
+            if not keys:
+                break
+
+            updated += len(keys)
+            last_key = max(keys)
+            logger.info(
+                f"Backfill of {table_name}: {updated} rows updated "
+                f"(~{estimate} rows in table, {time.monotonic() - started:.1f}s)"
+            )
+            time.sleep(pause)
+
+    return updated
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, TypeVar
+
+from sqlalchemy.engine import Engine
+from sqlmodel import Session
+
+from template_project.config import DatabaseSettings
+from template_project.db.factories import (
+    SessionPolicy,
+    create_database_engine,
+    get_engine,
+    get_session_ctx,
+)
+
+T = TypeVar('T')
+
+# The main database is the first shard, and holds the global email index
+DIRECTORY_SHARD = 0
+
+router = None
+
+
+def parse_shard(shard: str) -> tuple[str, int | None, str]:
+    """
+    Parse a shard address of the form `hostname[:port]/database`.
+
+    Returns:
+        The hostname, port and database name of the shard.
+    """
+    address, _, database = shard.partition('/')
+    hostname, _, port = address.partition(':')
+    if not hostname or not database:
+        raise ValueError(
+            f"Invalid shard '{shard}', expected 'hostname[:port]/database'"
+        )
+    return hostname, int(port) if port else None, database
+
+
+class ShardRouter:
+    """
+    Route users to the database shard holding them.
+
+    Users are placed on a shard by hashing their ID, so the shard of a user is known
+    without a lookup. Email addresses are resolved to a user ID and shard through the
+    global `UserDirectory` index, kept in the main database, which is the first shard.
+
+    The number of shards cannot change without moving the users to their new shard.
+
+    Args:
+        shards: The addresses of the shards after the main database, of the form
+            `hostname[:port]/database`.
+    """
+
+    def __init__(self, shards: Iterable[str] = ()):
+        self.addresses = [parse_shard(shard) for shard in shards]
+        self.engines: dict[int, Engine] = {}
+        self.lock = threading.Lock()
+        self.executor: ThreadPoolExecutor | None = None
+
+    @property
+    def shards(self) -> range:
+        """The identifiers of every shard."""
+        return range(len(self.addresses) + 1)
+
+    @property
+    def sharded(self) -> bool:
+        """Whether any shard is configured besides the main database."""
+        return bool(self.addresses)
+
+    def shard_for_user(self, user_id: uuid.UUID | str) -> int:
+        """Select the shard of a user, using a hash that is stable across processes."""
+        if not isinstance(user_id, uuid.UUID):
+            user_id = uuid.UUID(user_id)
+        digest = hashlib.blake2b(user_id.bytes, digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % len(self.shards)
+
+    def get_engine(self, shard: int) -> Engine:
+        """Return the engine of a shard, creating it if necessary."""
+        if shard == DIRECTORY_SHARD:
+            return get_engine()
+        with self.lock:
+            if shard not in self.engines:
+                self.engines[shard] = create_database_engine(*self.addresses[shard - 1])
+            return self.engines[shard]
+
+    @contextmanager
+    def session(
+        self, shard: int, policy: SessionPolicy | None = None
+    ) -> Iterator[Session]:
+        """
+        Context manager for obtaining a session on a shard, see `get_db_session`.
+
+        The session commits on success and rolls back in case of errors. Loaded objects
+        are not expired on commit, so they can be returned from the context.
+
+        Args:
+            shard: The shard of the session.
+            policy (optional): The transaction policy of the session.
+        """
+        with get_session_ctx(self.get_engine(shard), policy) as session:
+            session.expire_on_commit = False
+            yield session
+
+    def fan_out(
+        self,
+        operation: Callable[[Session, int], T],
+        shards: Iterable[int] | None = None,
+        policy: SessionPolicy | None = None,
+    ) -> dict[int, T]:
+        """
+        Run an operation on several shards concurrently, each in its own session.
+
+        Args:
+            operation: The operation, receiving the session and the shard.
+            shards (optional): The shards to run the operation on. Defaults to all.
+            policy (optional): The transaction policy of the sessions.
+
+        Returns:
+            The result of the operation by shard.
+
+        Raises:
+            Any exception raised by the operation on one of the shards.
+        """
+        shards = list(self.shards if shards is None else shards)
+
+        def run(shard: int) -> T:
+            with self.session(shard, policy) as session:
+                return operation(session, shard)
+
+        if len(shards) == 1:
+            return {shards[0]: run(shards[0])}
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=len(self.shards), thread_name_prefix='shard'
+            )
+        futures = {shard: self.executor.submit(run, shard) for shard in shards}
+        return {shard: future.result() for shard, future in futures.items()}
+
+    def dispose(self) -> None:
+        """Close the pooled connections of the shards, except the main database."""
+        with self.lock:
+            for engine in self.engines.values():
+                engine.dispose()
+            self.engines = {}
+
+
+def get_shard_router() -> ShardRouter:
+    """Return the router shared across the application, creating it if necessary."""
+    global router
+    if not router:
+        router = ShardRouter(DatabaseSettings().SHARDS)  # type: ignore
+    return router
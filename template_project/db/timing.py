@@ -0,0 +1,24 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Accumulated query time in seconds of the current request, when tracked. The value is
+# a mutable holder, so queries run in worker threads, which copy the context, still
+# add to the total of the request.
+query_time: ContextVar[list[float] | None] = ContextVar('query_time', default=None)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    total = query_time.get()
+    started = getattr(context, '_query_started', None)
+    if total is not None and started is not None:
+        total[0] += time.perf_counter() - started
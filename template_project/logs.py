@@ -0,0 +1,130 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from template_project.config import LoggingSettings
+
+# Attributes of every log record, anything else was passed through `extra`
+RECORD_ATTRIBUTES = {*logging.makeLogRecord({}).__dict__, 'message', 'asctime'}
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Logging handler passing records to a listener thread through a bounded queue.
+
+    Logging never blocks the caller: when the queue is full, records are dropped and
+    counted, and a warning reporting the number of dropped records is logged once the
+    queue has room again.
+    """
+
+    def __init__(self, queue: queue.Queue):
+        super().__init__(queue)
+        self.dropped = 0
+        self._unreported = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback in the calling thread, but
+        # leave the formatting, including extra fields, to the listener.
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self._unreported:
+                self.queue.put_nowait(
+                    logging.makeLogRecord(
+                        {
+                            'name': __name__,
+                            'levelno': logging.WARNING,
+                            'levelname': 'WARNING',
+                            'msg': f"Dropped {self._unreported} log records, queue full",
+                        }
+                    )
+                )
+                self._unreported = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._unreported += 1
+
+
+class LogListener(QueueListener):
+    """`QueueListener` that can be stopped more than once, even with a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        # wait for the listener to make room, instead of failing on a full queue
+        self.queue.put(self._sentinel)
+
+    def stop(self) -> None:
+        if self._thread:
+            super().stop()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format log records as single line JSON objects, including extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in record.__dict__.items()
+            if key not in RECORD_ATTRIBUTES
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(config: LoggingSettings) -> LogListener:
+    """
+    Configure the root logger to write through a queue and a listener thread.
+
+    Log records are put on a bounded queue by `DroppingQueueHandler`, and written to
+    stderr by a `LogListener` thread, so slow log sinks never block the event loop.
+    The listener is stopped, flushing the remaining records, when the process exits.
+
+    Args:
+        config: The logging configuration.
+
+    Returns:
+        The started `LogListener`.
+    """
+    if config.FORMAT == 'json':
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s %(levelname)s %(message)s')
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=config.QUEUE_SIZE)
+    listener = LogListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(config.LEVEL)
+
+    listener.start()
+    atexit.register(listener.stop)
+
+    return listener
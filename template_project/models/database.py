@@ -1,7 +1,10 @@
 import uuid
 from datetime import datetime
+from typing import Any
 
-from sqlmodel import Field, func
+from sqlalchemy import BigInteger, Index, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel, func
 
 from template_project.models.validation import UserBase
 
@@ -20,13 +23,29 @@ class User(UserBase, table=True):
         hashed_password (str): The hashed version of the user's password.
         created_at (datetime): The timestamp when the user was created, assigned by the database.
         updated_at (datetime): The timestamp when the user was last updated, assigned by the database on update.
+        last_login_at (datetime | None): The timestamp of the last login of the user, if any.
 
     Notes:
         The `created_at` and `updated_at` fields have a default value set by the database, using `server_default`.
         Additionally `updated_at` is updated automatically on modification.
+        The `last_login_at` field is written in batches after the login, so it may lag behind by a few seconds.
+        Emails are unique regardless of case, and `pg_trgm` indexes support fuzzy search on emails and names.
     """
 
     __tablename__ = "users"  # type: ignore
+    __table_args__ = (
+        Index('ix_users_email_lower', text('lower(email)'), unique=True),
+        Index(
+            'ix_users_email_trgm',
+            text('lower(email) gin_trgm_ops'),
+            postgresql_using='gin',
+        ),
+        Index(
+            'ix_users_name_trgm',
+            text("lower(first_name || ' ' || last_name) gin_trgm_ops"),
+            postgresql_using='gin',
+        ),
+    )
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
     hashed_password: str
     created_at: datetime = Field(
@@ -36,3 +55,76 @@ class User(UserBase, table=True):
         default=None,
         sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()},
     )
+    last_login_at: datetime | None = None
+
+
+class UserDirectory(SQLModel, table=True):
+    """
+    Database model representing the global index of user email addresses.
+
+    Attributes:
+        email (str): The lowercased email address of the user.
+        user_id (UUID): The unique identifier of the user.
+        shard (int): The shard holding the user.
+
+    Notes:
+        The index is kept in the main database, and guarantees that email addresses are unique across shards.
+    """
+
+    __tablename__ = "user_directory"  # type: ignore
+    email: str = Field(primary_key=True, max_length=255)
+    user_id: uuid.UUID = Field(unique=True)
+    shard: int
+
+
+class Job(SQLModel, table=True):
+    """
+    Database model representing a background job.
+
+    Attributes:
+        id (int): The unique identifier of the job.
+        name (str): The name of the registered task to run.
+        payload (dict): The keyword arguments of the task.
+        priority (int): Jobs with a higher priority are claimed first.
+        status (str): One of `queued`, `running`, `done` or `failed`.
+        attempts (int): The number of times the job has been claimed.
+        max_attempts (int): The number of attempts after which the job is marked as failed.
+        run_at (datetime): The earliest time the job may run, assigned by the database by default.
+        locked_at (datetime | None): The time the job was last claimed by a worker.
+        last_error (str | None): The error of the last failed attempt.
+        created_at (datetime): The timestamp when the job was created, assigned by the database.
+        updated_at (datetime): The timestamp when the job was last updated, assigned by the database on update.
+
+    Notes:
+        Workers claim queued jobs with `FOR UPDATE SKIP LOCKED`, served by a partial index on
+        queued jobs ordered by priority and `run_at`.
+    """
+
+    __tablename__ = "jobs"  # type: ignore
+    __table_args__ = (
+        Index(
+            'ix_jobs_queued',
+            text('priority DESC'),
+            'run_at',
+            postgresql_where=text("status = 'queued'"),
+        ),
+    )
+    id: int | None = Field(default=None, primary_key=True, sa_type=BigInteger)
+    name: str = Field(max_length=255)
+    payload: dict[str, Any] = Field(default_factory=dict, sa_type=JSONB)
+    priority: int = 0
+    status: str = Field(default='queued', max_length=16)
+    attempts: int = 0
+    max_attempts: int = 5
+    run_at: datetime = Field(
+        default=None, sa_column_kwargs={"server_default": func.now()}
+    )
+    locked_at: datetime | None = None
+    last_error: str | None = None
+    created_at: datetime = Field(
+        default=None, sa_column_kwargs={"server_default": func.now()}
+    )
+    updated_at: datetime = Field(
+        default=None,
+        sa_column_kwargs={"server_default": func.now(), "onupdate": func.now()},
+    )
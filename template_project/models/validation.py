@@ -1,8 +1,14 @@
 import uuid
+from datetime import datetime
 
 from pydantic import EmailStr
 from sqlmodel import AutoString, Field, SQLModel
 
+# Upper bound of the items of a batch request, checked while the body is parsed so
+# oversized requests are rejected before validating every item. `API_BATCH_MAX_SIZE`
+# sets the lower limit applied by the API.
+BATCH_MAX_ITEMS = 1000
+
 
 class UserBase(SQLModel):
     """
@@ -77,6 +83,37 @@ class UserPublic(UserBase):
     id: uuid.UUID
 
 
+class UserBatchRequest(SQLModel):
+    """
+    Model for looking up multiple users at once.
+
+    Attributes:
+        ids (list[UUID]): The unique identifiers of the users to look up, at most
+            `BATCH_MAX_ITEMS`.
+        emails (list[EmailStr]): The email addresses of the users to look up, at most
+            `BATCH_MAX_ITEMS`.
+    """
+
+    ids: list[uuid.UUID] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS)
+    emails: list[EmailStr] = Field(default_factory=list, max_length=BATCH_MAX_ITEMS)
+
+
+class UserBatchResponse(SQLModel):
+    """
+    Response model containing the result of a batch user lookup.
+
+    Attributes:
+        users (list[UserPublic]): The users found, in the order they were requested,
+            requested IDs first followed by requested emails.
+        not_found_ids (list[UUID]): The requested IDs that do not match any user.
+        not_found_emails (list[EmailStr]): The requested emails that do not match any user.
+    """
+
+    users: list[UserPublic]
+    not_found_ids: list[uuid.UUID]
+    not_found_emails: list[EmailStr]
+
+
 class TokenResponse(SQLModel):
     """
     Response model containing the access token.
@@ -86,3 +123,18 @@ class TokenResponse(SQLModel):
     """
 
     access_token: str
+
+
+class CachedUser(SQLModel):
+    """
+    Entity cache entry for a user, stored together with its HTTP validators.
+
+    Attributes:
+        user (UserPublic): The user's public information.
+        etag (str): The strong entity tag derived from the user's ID and `updated_at`.
+        last_modified (datetime): The timestamp when the user was last updated.
+    """
+
+    user: UserPublic
+    etag: str
+    last_modified: datetime
@@ -0,0 +1,269 @@
+import asyncio
+import importlib
+import logging
+import signal
+import time
+from datetime import datetime, timedelta, timezone
+from inspect import iscoroutinefunction
+from typing import Any, Callable
+
+from template_project.config import WorkerSettings
+from template_project.db.controllers import jobs
+from template_project.db.factories import get_engine, get_session_ctx
+from template_project.models.database import Job
+
+logger = logging.getLogger(__name__)
+
+# Registered tasks by name
+tasks: dict[str, Callable[..., Any]] = {}
+
+
+def task(name: str | None = None) -> Callable[[Callable], Callable]:
+    """
+    Register a function as a task that can run in the background job queue.
+
+    Tasks receive the job payload as keyword arguments and may be sync or async. Sync
+    tasks run in a thread, so they can use the database through `get_session_ctx`.
+
+    Args:
+        name (optional): The name of the task. Defaults to the function name.
+
+    Usage:
+        ```python
+        @task()
+        def send_email(user_id: str):
+            pass
+
+        with get_session_ctx() as session:
+            enqueue_job(session, 'send_email', {'user_id': str(user.id)})
+        ```
+    """
+
+    def decorator(func: Callable) -> Callable:
+        tasks[name or func.__name__] = func
+        return func
+
+    return decorator
+
+
+class Worker:
+    """
+    Background job worker running up to `concurrency` jobs at a time.
+
+    The worker claims due jobs with `FOR UPDATE SKIP LOCKED`, and sleeps until a job is
+    enqueued, which is signalled through `LISTEN/NOTIFY`, or until the next scheduled
+    job is due. Failed jobs are retried with exponential backoff.
+
+    Running jobs are marked with a heartbeat, so that only the jobs of workers that
+    stopped without finishing them are queued again, see `requeue_stale_jobs`.
+    """
+
+    def __init__(self, config: WorkerSettings, concurrency: int | None = None):
+        self.config = config
+        self.concurrency = concurrency or config.CONCURRENCY
+        self.running: set[asyncio.Task] = set()
+        self.running_jobs: set[int] = set()
+        self.wakeup = asyncio.Event()
+        self.stopping = asyncio.Event()
+
+    def _connect_listener(self) -> Any:
+        connection = get_engine().raw_connection()
+        connection.detach()
+
+        dbapi_connection = connection.driver_connection
+        dbapi_connection.autocommit = True
+        try:
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {jobs.JOBS_CHANNEL}")
+        except Exception:
+            dbapi_connection.close()
+            raise
+        return dbapi_connection
+
+    async def _listen(self) -> None:
+        """Wake up on notifications, and connect again when the connection is lost."""
+        loop = asyncio.get_running_loop()
+        delay = 1.0
+
+        while True:
+            try:
+                listener = await asyncio.to_thread(self._connect_listener)
+            except Exception:
+                logger.exception(f"Failed to listen for jobs, retrying in {delay:.0f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.config.POLL_INTERVAL)
+                continue
+
+            delay = 1.0
+            lost = asyncio.Event()
+            fd = listener.fileno()
+
+            def notified():
+                try:
+                    listener.poll()
+                except Exception:
+                    logger.warning(
+                        "Lost the connection listening for jobs", exc_info=True
+                    )
+                    loop.remove_reader(fd)
+                    lost.set()
+                    return
+                listener.notifies.clear()
+                self.wakeup.set()
+
+            loop.add_reader(fd, notified)
+            # jobs may have been enqueued while not listening
+            self.wakeup.set()
+            try:
+                await lost.wait()
+            finally:
+                loop.remove_reader(fd)
+                listener.close()
+
+    async def _heartbeat(self) -> None:
+        """Mark the running jobs as alive, so they are not considered abandoned."""
+        while True:
+            await asyncio.sleep(self.config.HEARTBEAT_INTERVAL)
+            if not self.running_jobs:
+                continue
+            try:
+                await asyncio.to_thread(self._touch, [*self.running_jobs])
+            except Exception:
+                logger.exception("Failed to record the heartbeat of running jobs")
+
+    def _touch(self, job_ids: list[int]) -> None:
+        with get_session_ctx() as session:
+            jobs.heartbeat_jobs(session=session, job_ids=job_ids)
+
+    def _claim(self, limit: int) -> tuple[list[Job], datetime | None]:
+        with get_session_ctx() as session:
+            claimed = jobs.claim_jobs(session=session, limit=limit)
+            # keep the loaded jobs usable once the session commits and closes
+            for job in claimed:
+                session.expunge(job)
+            next_run_at = None
+            if len(claimed) < limit:
+                next_run_at = jobs.get_next_run_at(session=session)
+            return claimed, next_run_at
+
+    def _complete(self, job: Job, error: str | None = None) -> None:
+        with get_session_ctx() as session:
+            if error is None:
+                jobs.complete_job(session=session, job_id=job.id)
+                return
+
+            delay = min(
+                self.config.RETRY_BACKOFF_BASE * 2 ** (job.attempts - 1),
+                self.config.RETRY_BACKOFF_MAX,
+            )
+            jobs.fail_job(
+                session=session,
+                job=job,
+                error=error,
+                retry_in=timedelta(seconds=delay),
+            )
+
+    def _requeue_stale(self) -> None:
+        with get_session_ctx() as session:
+            count = jobs.requeue_stale_jobs(
+                session=session, timeout=timedelta(seconds=self.config.STALE_TIMEOUT)
+            )
+        if count:
+            logger.warning(f"Recovered {count} abandoned jobs")
+
+    async def _execute(self, job: Job) -> None:
+        func = tasks.get(job.name)
+        error = None
+        self.running_jobs.add(job.id)
+
+        try:
+            if func is None:
+                raise LookupError(f"Unknown task '{job.name}'")
+            if iscoroutinefunction(func):
+                await func(**job.payload)
+            else:
+                await asyncio.to_thread(func, **job.payload)
+        except Exception as exc:
+            logger.exception(f"Job {job.id} ({job.name}) failed")
+            error = repr(exc)
+            if func is None:
+                job.attempts = job.max_attempts
+
+        try:
+            await asyncio.to_thread(self._complete, job, error)
+        except Exception:
+            logger.exception(f"Failed to record the result of job {job.id}")
+        finally:
+            self.running_jobs.discard(job.id)
+        self.wakeup.set()
+
+    async def _sleep(self, next_run_at: datetime | None) -> None:
+        timeout = self.config.POLL_INTERVAL
+        if next_run_at:
+            # database timestamps are naive UTC
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            due_in = (next_run_at - now).total_seconds()
+            timeout = min(timeout, max(due_in, 0))
+
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.wakeup.clear()
+
+    async def run(self) -> None:
+        """Run jobs until the process receives SIGINT or SIGTERM."""
+        for module in self.config.TASK_MODULES:
+            importlib.import_module(module)
+
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, self.stop)
+
+        background = [
+            asyncio.create_task(self._listen()),
+            asyncio.create_task(self._heartbeat()),
+        ]
+        logger.info(f"Worker started with {self.concurrency} slots, tasks: {[*tasks]}")
+
+        requeued_at = 0.0
+        try:
+            while not self.stopping.is_set():
+                free = self.concurrency - len(self.running)
+                next_run_at = None
+
+                try:
+                    if time.monotonic() - requeued_at > self.config.POLL_INTERVAL:
+                        await asyncio.to_thread(self._requeue_stale)
+                        requeued_at = time.monotonic()
+                    if free:
+                        claimed, next_run_at = await asyncio.to_thread(
+                            self._claim, free
+                        )
+                except Exception:
+                    logger.exception("Failed to claim jobs")
+                    await self._sleep(None)
+                    continue
+
+                if free:
+                    for job in claimed:
+                        running = asyncio.create_task(self._execute(job))
+                        self.running.add(running)
+                        running.add_done_callback(self.running.discard)
+                    if len(claimed) == free:
+                        continue
+
+                await self._sleep(next_run_at)
+        finally:
+            if self.running:
+                logger.info(f"Waiting for {len(self.running)} running jobs to finish")
+                await asyncio.gather(*self.running, return_exceptions=True)
+
+            for background_task in background:
+                background_task.cancel()
+            await asyncio.gather(*background, return_exceptions=True)
+
+    def stop(self) -> None:
+        """Stop claiming jobs, and exit once the running jobs have finished."""
+        self.stopping.set()
+        self.wakeup.set()
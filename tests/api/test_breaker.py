@@ -0,0 +1,298 @@
+import asyncio
+
+import fakeredis
+import pytest
+from fakeredis.aioredis import FakeRedis
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.decorator import cache as cached
+from redis.exceptions import ConnectionError, ResponseError
+
+from template_project.api import cache
+from template_project.api.breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+
+RESET_TIMEOUT = 0.05
+
+pytestmark = pytest.mark.anyio
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {
+        'timeout': 0.05,
+        'failure_threshold': 3,
+        'reset_timeout': RESET_TIMEOUT,
+        'failure_exceptions': cache.REDIS_FAILURES,
+    }
+    return CircuitBreaker('redis', **{**options, **kwargs})
+
+
+async def fail():
+    raise ConnectionError("Connection refused")
+
+
+async def hang():
+    await asyncio.sleep(10)
+
+
+async def succeed():
+    return 'ok'
+
+
+async def trip(breaker: CircuitBreaker) -> None:
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+
+
+class HangingBackend(Backend):
+    """Backend standing in for a Redis server that accepts connections but hangs."""
+
+    async def get_with_ttl(self, key):
+        await hang()
+
+    async def get(self, key):
+        await hang()
+
+    async def set(self, key, value, expire=None):
+        await hang()
+
+    async def clear(self, namespace=None, key=None):
+        await hang()
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def redis(server):
+    return FakeRedis(server=server)
+
+
+@pytest.fixture
+def breaker(monkeypatch, redis):
+    breaker = make_breaker(on_close=cache._schedule_retry_invalidations)
+    monkeypatch.setattr(cache, 'redis_client', redis)
+    monkeypatch.setattr(cache, 'breaker', breaker)
+    monkeypatch.setattr(cache, 'failed_invalidations', set())
+
+    FastAPICache.init(
+        cache.TaggedBackend(cache.CircuitBreakerBackend(RedisBackend(redis), breaker)),
+        prefix='test',
+    )
+    yield breaker
+    FastAPICache.reset()
+
+
+async def test_opens_after_consecutive_failures():
+    breaker = make_breaker()
+
+    await trip(breaker)
+
+    assert breaker.state == OPEN
+    assert breaker.info()['trips'] == 1
+    assert breaker.info()['last_error'] == "ConnectionError('Connection refused')"
+
+
+async def test_success_resets_failure_count():
+    breaker = make_breaker()
+
+    for _ in range(breaker.failure_threshold - 1):
+        with pytest.raises(ConnectionError):
+            await breaker.call(fail)
+    assert await breaker.call(succeed) == 'ok'
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 1
+
+
+async def test_timeouts_count_as_failures():
+    breaker = make_breaker()
+
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(asyncio.TimeoutError):
+            await breaker.call(hang)
+
+    assert breaker.state == OPEN
+
+
+async def test_other_exceptions_are_not_failures():
+    breaker = make_breaker(failure_threshold=1)
+
+    async def invalid():
+        raise ValueError()
+
+    with pytest.raises(ValueError):
+        await breaker.call(invalid)
+
+    assert breaker.state == CLOSED
+
+
+async def test_command_errors_are_not_failures():
+    breaker = make_breaker()
+
+    async def unsupported():
+        raise ResponseError("syntax error")
+
+    for _ in range(breaker.failure_threshold * 2):
+        with pytest.raises(ResponseError):
+            await breaker.call(unsupported)
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+
+
+async def test_open_breaker_rejects_without_calling():
+    breaker = make_breaker()
+    await trip(breaker)
+    calls = []
+
+    async def operation():
+        calls.append(1)
+
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(operation)
+
+    assert not calls
+    assert breaker.info()['rejected'] == 1
+
+
+async def test_half_open_lets_a_single_probe_through():
+    breaker = make_breaker()
+    await trip(breaker)
+    await asyncio.sleep(RESET_TIMEOUT)
+    assert breaker.state == HALF_OPEN
+
+    release = asyncio.Event()
+
+    async def probe():
+        await release.wait()
+        return 'ok'
+
+    task = asyncio.create_task(breaker.call(probe))
+    await asyncio.sleep(0)
+    with pytest.raises(CircuitOpenError):
+        await breaker.call(succeed)
+
+    release.set()
+    assert await task == 'ok'
+    assert breaker.state == CLOSED
+
+
+async def test_successful_probe_closes_the_breaker():
+    closed = []
+    breaker = make_breaker(on_close=lambda: closed.append(1))
+    await trip(breaker)
+    await asyncio.sleep(RESET_TIMEOUT)
+
+    assert await breaker.call(succeed) == 'ok'
+
+    assert breaker.state == CLOSED
+    assert breaker.failures == 0
+    assert closed == [1]
+
+
+async def test_failed_probe_opens_the_breaker_again():
+    breaker = make_breaker()
+    await trip(breaker)
+    await asyncio.sleep(RESET_TIMEOUT)
+
+    with pytest.raises(ConnectionError):
+        await breaker.call(fail)
+
+    assert breaker.state == OPEN
+    assert breaker.info()['trips'] == 2
+
+
+async def test_backend_skips_the_cache_while_open(server, breaker):
+    backend = FastAPICache.get_backend()
+    await backend.set('key', b'value', 60)
+    assert (await backend.get_with_ttl('key'))[1] == b'value'
+
+    server.connected = False
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(ConnectionError):
+            await backend.get_with_ttl('key')
+    assert breaker.state == OPEN
+
+    # Redis is not called while the breaker is open
+    assert await backend.get_with_ttl('key') == (0, None)
+    assert await backend.get('key') is None
+    await backend.set('key', b'other', 60)
+    assert breaker.info()['rejected'] == 3
+
+    server.connected = True
+    await asyncio.sleep(RESET_TIMEOUT)
+    assert (await backend.get_with_ttl('key'))[1] == b'value'
+    assert breaker.state == CLOSED
+
+
+async def test_hanging_backend_is_bounded_by_the_timeout():
+    breaker = make_breaker()
+    backend = cache.CircuitBreakerBackend(HangingBackend(), breaker)
+
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(backend.get_with_ttl('key'), 1)
+
+    assert breaker.state == OPEN
+    assert await asyncio.wait_for(backend.get_with_ttl('key'), 0.01) == (0, None)
+
+
+async def test_cached_endpoint_runs_its_handler_while_open(server, breaker):
+    calls = []
+
+    @cached(expire=60)
+    async def endpoint():
+        calls.append(1)
+        return {'calls': len(calls)}
+
+    assert await endpoint() == {'calls': 1}
+    assert await endpoint() == {'calls': 1}
+
+    server.connected = False
+    await trip(breaker)
+
+    assert await endpoint() == {'calls': 2}
+    assert await endpoint() == {'calls': 3}
+
+
+async def test_entity_cache_misses_while_open(server, breaker, caplog):
+    user_id = '00000000-0000-0000-0000-000000000001'
+
+    server.connected = False
+    await trip(breaker)
+
+    assert await cache.get_cached_users([user_id]) == {}
+    assert not [record for record in caplog.records if record.name == cache.__name__]
+
+
+async def test_invalidations_are_retried_when_the_breaker_closes(
+    server, redis, breaker
+):
+    user_id = '00000000-0000-0000-0000-000000000001'
+    key = cache.user_cache_key(user_id)
+    await cache.set_many({key: b'user'}, tags={key: [cache.user_tag(user_id)]})
+
+    server.connected = False
+    await trip(breaker)
+    await cache.invalidate_cached_user(user_id)
+    assert cache.failed_invalidations == {cache.user_tag(user_id)}
+
+    server.connected = True
+    await asyncio.sleep(RESET_TIMEOUT)
+    assert await cache.get_many('other') == [None]
+    await asyncio.sleep(0.01)
+
+    assert not await redis.exists(key)
+    assert not cache.failed_invalidations
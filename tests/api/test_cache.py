@@ -0,0 +1,91 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fakeredis.aioredis import FakeRedis
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+
+from template_project.api import cache
+from template_project.api.coders import MAGIC, FramedCoder
+from template_project.models.validation import CachedUser, UserPublic
+
+pytestmark = pytest.mark.anyio
+
+USER_ID = uuid.UUID('00000000-0000-0000-0000-000000000001')
+
+
+@pytest.fixture(autouse=True)
+def backend():
+    backend = InMemoryBackend()
+    FastAPICache.init(cache.TaggedBackend(backend), prefix='test', coder=FramedCoder)
+    yield backend
+    FastAPICache.reset()
+
+
+def make_cached_user() -> CachedUser:
+    return CachedUser(
+        user=UserPublic(
+            id=USER_ID, email='ada@example.com', first_name='Ada', last_name='Lovelace'
+        ),
+        etag='"etag"',
+        last_modified=datetime(2024, 1, 1, tzinfo=timezone.utc),
+    )
+
+
+async def test_cached_user_round_trip():
+    await cache.set_cached_user(make_cached_user())
+
+    assert await cache.get_cached_user(USER_ID) == make_cached_user()
+
+
+@pytest.mark.parametrize(
+    'value',
+    [
+        # A future format version
+        MAGIC + bytes([2, 1, 0]) + b'{}',
+        # An unknown serializer
+        MAGIC + bytes([1, 99, 0]) + b'{}',
+        # A value that is not a user entry
+        MAGIC + bytes([1, 1, 0]) + b'{"user": null}',
+    ],
+)
+async def test_undecodable_entries_are_misses(backend, value):
+    await backend.set(cache.user_cache_key(USER_ID), value)
+
+    assert await cache.get_cached_user(USER_ID) is None
+
+
+async def test_entity_entries_expire(backend, monkeypatch):
+    monkeypatch.setattr(cache, 'entity_expiration', 300)
+
+    await cache.set_cached_user(make_cached_user())
+
+    ttl, _ = await backend.get_with_ttl(cache.user_cache_key(USER_ID))
+    assert 0 < ttl <= 300
+
+
+async def test_stale_entry_stored_after_an_update_is_invalidated_again(monkeypatch):
+    monkeypatch.setattr(cache, 'invalidation_delay', 0.01)
+    await cache.set_cached_user(make_cached_user())
+
+    # A read loads the user before the update, and stores it after the invalidation
+    await cache.invalidate_cached_user(USER_ID)
+    await cache.set_cached_user(make_cached_user())
+    assert await cache.get_cached_user(USER_ID)
+
+    await asyncio.sleep(0.05)
+    assert await cache.get_cached_user(USER_ID) is None
+
+
+async def test_tag_sets_live_as_long_as_their_longest_lived_key(monkeypatch):
+    redis = FakeRedis()
+    monkeypatch.setattr(cache, 'redis_client', redis)
+    tag = cache.user_tag(USER_ID)
+
+    await cache.set_many({'short': b'1'}, 60, tags={'short': [tag]})
+    await cache.set_many({'long': b'1'}, 600, tags={'long': [tag]})
+    await cache.set_many({'other': b'1'}, 60, tags={'other': [tag]})
+
+    assert 60 < await redis.ttl(cache.tag_cache_key(tag)) <= 600
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+import uuid
+
+import pytest
+
+from template_project.api import last_login
+from template_project.api.last_login import LastLoginBuffer
+
+pytestmark = pytest.mark.anyio
+
+
+class Writer:
+    """Stands in for the database, writing each batch slowly from a thread."""
+
+    def __init__(self):
+        self.written = {}
+        self.started = threading.Event()
+
+    def __call__(self, logins):
+        self.started.set()
+        time.sleep(0.05)
+        self.written.update(logins)
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = Writer()
+    monkeypatch.setattr(last_login, '_write', writer)
+    return writer
+
+
+@pytest.fixture
+def buffer():
+    return LastLoginBuffer(flush_interval=60, flush_size=2, max_pending=100)
+
+
+async def test_stop_writes_every_pending_login_during_a_flush(buffer, writer):
+    user_ids = [uuid.uuid4() for _ in range(6)]
+    buffer.start()
+    for user_id in user_ids:
+        buffer.record(user_id)
+
+    # stop while the first batch is being written
+    await asyncio.to_thread(writer.started.wait, 1)
+    await buffer.stop()
+
+    assert set(writer.written) == set(user_ids)
+    assert not buffer.pending
+
+
+async def test_cancelled_flush_keeps_unwritten_logins(buffer, writer):
+    user_ids = [uuid.uuid4() for _ in range(6)]
+    for user_id in user_ids:
+        buffer.record(user_id)
+
+    task = asyncio.create_task(buffer.flush())
+    await asyncio.to_thread(writer.started.wait, 1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert set(buffer.pending) == set(user_ids)
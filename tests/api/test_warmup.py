@@ -0,0 +1,23 @@
+from collections import Counter
+
+import pytest
+
+from template_project.api import warmup
+
+
+@pytest.fixture(autouse=True)
+def access_counts(monkeypatch):
+    counts = Counter()
+    monkeypatch.setattr(warmup, 'access_counts', counts)
+    monkeypatch.setattr(warmup, '_max_tracked', 10)
+    return counts
+
+
+def test_access_counts_are_bounded(access_counts):
+    for _ in range(5):
+        warmup.record_access('hot')
+    for user_id in range(100):
+        warmup.record_access(str(user_id))
+
+    assert len(access_counts) <= 10
+    assert access_counts.most_common(1) == [('hot', 5)]
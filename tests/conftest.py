@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+# Settings required when the application modules are imported. No test connects to
+# this database, the PostgreSQL tests use `TEST_PG_DSN`.
+for name, value in {
+    'PG_HOSTNAME': 'localhost',
+    'PG_PORT': '5432',
+    'PG_DATABASE': 'test',
+    'PG_USER': 'test',
+    'PG_PASSWORD': 'test',
+    'TOKEN_SECRET_KEY': 'test',
+    'TOKEN_ALGORITHM': 'HS256',
+    'API_ORIGINS': '["*"]',
+    'API_TOKEN': 'test',
+}.items():
+    os.environ.setdefault(name, value)
+
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
@@ -0,0 +1,37 @@
+import pytest
+
+from template_project.bench import percentile, read_access_log
+
+
+@pytest.mark.parametrize(
+    'values, q, expected',
+    [
+        ([1, 2], 50, 1),
+        (list(range(1, 11)), 50, 5),
+        (list(range(1, 101)), 95, 95),
+        (list(range(1, 1001)), 99.9, 999),
+        (list(range(1, 1001)), 100, 1000),
+        ([7], 50, 7),
+    ],
+)
+def test_percentile_is_nearest_rank(values, q, expected):
+    assert percentile(values, q) == expected
+
+
+def test_replay_keeps_query_strings():
+    lines = [
+        '{"time": "2024-01-01T00:00:00+00:00", "method": "GET", '
+        '"path": "/accounts/search", "query": "q=ada&limit=5", '
+        '"route": "/accounts/search"}',
+        '{"time": "2024-01-01T00:00:01+00:00", "method": "GET", '
+        '"path": "/accounts/me", "query": "", "route": "/accounts/me"}',
+    ]
+
+    requests = list(read_access_log(lines))
+
+    assert [request.path for request in requests] == [
+        '/accounts/search?q=ada&limit=5',
+        '/accounts/me',
+    ]
+    assert requests[0].operation == '/accounts/search'
+    assert requests[1].offset == 1
@@ -0,0 +1,13 @@
+import pytest
+from pydantic import ValidationError
+
+from template_project.models.validation import BATCH_MAX_ITEMS, UserBatchRequest
+
+
+@pytest.mark.parametrize('field', ['ids', 'emails'])
+def test_batch_request_size_is_bounded(field):
+    # the items are invalid too, only the length is reported
+    with pytest.raises(ValidationError) as error:
+        UserBatchRequest.model_validate({field: ['invalid'] * (BATCH_MAX_ITEMS + 1)})
+
+    assert [e['type'] for e in error.value.errors()] == ['too_long']